@@ -0,0 +1,73 @@
+import argparse
+import tempfile
+import time
+import numpy as np
+
+from data import loader, repo
+
+from .synthetic import write_session
+
+
+def time_edits(data: loader.Data, n_edits: int, span: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    tracks = data.tracks
+    yolo_ids = np.unique(tracks.boxes[:, 4])
+    last_frame = int(tracks.frames.max())
+
+    start = time.perf_counter()
+    tracks.yolo_index
+    index_ms = (time.perf_counter() - start) * 1e3
+
+    latencies = []
+    missing_latencies = []
+    for _ in range(n_edits):
+        yolo_id = int(rng.choice(yolo_ids))
+        from_ = int(rng.integers(0, max(last_frame - span, 1)))
+
+        start = time.perf_counter()
+        frames = repo.update_rfid_map(data, yolo_id, data.rfids[0], from_, from_ + span)
+        latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        repo.update_missing_data(data, frames)
+        missing_latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    repo.update_rfid_map(data, int(yolo_ids[0]), data.rfids[0])
+    full_ms = (time.perf_counter() - start) * 1e3
+
+    return {
+        "index_ms": index_ms,
+        "edit_ms": float(np.median(latencies) * 1e3),
+        "missing_data_ms": float(np.median(missing_latencies) * 1e3),
+        "full_range_ms": full_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="update_rfid_map latency against session length."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--span", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'frames':>10} {'index build (ms)':>17} {'edit (ms)':>10}"
+        f" {'missing data (ms)':>18} {'full range (ms)':>16}"
+    )
+    for n_frames in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            data = loader.load_data(write_session(tmp, n_frames))
+            res = time_edits(data, args.edits, args.span)
+        print(
+            f"{n_frames:>10} {res['index_ms']:>17.1f} {res['edit_ms']:>10.3f}"
+            f" {res['missing_data_ms']:>18.3f} {res['full_range_ms']:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
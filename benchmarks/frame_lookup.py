@@ -0,0 +1,54 @@
+import argparse
+import tempfile
+import time
+import numpy as np
+
+from data import drawer, loader, repo
+
+from .synthetic import write_session
+
+
+def time_lookups(data: loader.Data, n_lookups: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    frames = rng.integers(0, len(data.tracks.frame_index), size=n_lookups)
+    canvas = np.zeros((960, 1280, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    for frame in frames:
+        repo.get_frame_data(data.tracks, int(frame))
+    get_frame_data_us = (time.perf_counter() - start) / n_lookups * 1e6
+
+    start = time.perf_counter()
+    for frame in frames:
+        drawer.draw_bboxes(data.tracks, canvas, int(frame))
+    draw_bboxes_us = (time.perf_counter() - start) / n_lookups * 1e6
+
+    return {
+        "get_frame_data_us": get_frame_data_us,
+        "draw_bboxes_us": draw_bboxes_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-frame lookup cost against session length."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{'frames':>10} {'get_frame_data (us)':>20} {'draw_bboxes (us)':>18}")
+    for n_frames in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            data = loader.load_data(write_session(tmp, n_frames))
+            res = time_lookups(data, args.lookups)
+        print(
+            f"{n_frames:>10} {res['get_frame_data_us']:>20.1f}"
+            f" {res['draw_bboxes_us']:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
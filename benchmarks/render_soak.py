@@ -0,0 +1,66 @@
+import argparse
+import time
+import tkinter as tk
+import numpy as np
+import psutil
+
+from PIL import Image, ImageTk
+
+from ui.video_player import render_frame
+
+
+def render_frame_per_item(canvas, frame):
+    """The previous renderer: a new PhotoImage and canvas item for every frame."""
+    height, width, _ = frame.shape
+    canvas.config(width=width, height=height)
+    img = ImageTk.PhotoImage(master=canvas, image=Image.fromarray(frame))
+    canvas.image = img
+    canvas.create_image(0, 0, anchor=tk.NW, image=img)
+
+
+def soak(root, render, n_frames: int, report_every: int, width: int, height: int):
+    canvas = tk.Canvas(root, width=width, height=height)
+    canvas.pack()
+
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 255, size=(8, height, width, 3), dtype=np.uint8)
+    process = psutil.Process()
+    start = time.perf_counter()
+
+    for i in range(1, n_frames + 1):
+        render(canvas, frames[i % len(frames)])
+        root.update()
+
+        if i % report_every == 0:
+            elapsed = time.perf_counter() - start
+            print(
+                f"{i:>8} frames | {len(canvas.find_all()):>8} items"
+                f" | {process.memory_info().rss / 1e6:>8.1f} MB RSS"
+                f" | {report_every / elapsed:>6.1f} fps"
+            )
+            start = time.perf_counter()
+
+    canvas.destroy()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Canvas item count and memory over a long stretch of rendering."
+    )
+    parser.add_argument("--frames", type=int, default=108_000)
+    parser.add_argument("--report-every", type=int, default=9_000)
+    parser.add_argument("--width", type=int, default=728)
+    parser.add_argument("--height", type=int, default=544)
+    parser.add_argument(
+        "--legacy", action="store_true", help="soak the per-frame item renderer"
+    )
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    render = render_frame_per_item if args.legacy else render_frame
+    soak(root, render, args.frames, args.report_every, args.width, args.height)
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from data.loader import align_timestamps
+
+from .synthetic import FPS
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Nearest-frame alignment of RFID reads against frame times."
+    )
+    parser.add_argument("--reads", type=int, default=100_000)
+    parser.add_argument("--frames", type=int, default=1_000_000)
+    parser.add_argument(
+        "--baseline-reads",
+        type=int,
+        default=20,
+        help="reads timed with the old idxmin scan, extrapolated to --reads",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = 1_700_000_000.0 + np.arange(args.frames) / FPS
+    reads = rng.uniform(times[0] - 60, times[-1] + 60, size=args.reads)
+
+    start = time.perf_counter()
+    positions = align_timestamps(times, reads, max_gap=1 / FPS)
+    elapsed = time.perf_counter() - start
+
+    time_col = pd.Series(times)
+    start = time.perf_counter()
+    for x in reads[: args.baseline_reads]:
+        (time_col - x).abs().idxmin()
+    baseline = (time.perf_counter() - start) / args.baseline_reads
+
+    print(f"{args.reads} reads against {args.frames} frames")
+    print(f"searchsorted:  {elapsed:.3f} s ({np.sum(positions < 0)} flagged)")
+    print(f"idxmin scan:   {baseline * args.reads:.1f} s (extrapolated)")
+
+
+if __name__ == "__main__":
+    main()
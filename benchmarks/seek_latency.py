@@ -0,0 +1,103 @@
+import argparse
+import hashlib
+import time
+import cv2
+import numpy as np
+
+from data.keyframes import load_keyframes
+from ui.frame_reader import FrameReader
+
+
+def frame_hashes(video_path: str, n_frames: int) -> list[str]:
+    cap = cv2.VideoCapture(video_path)
+    hashes = []
+    for _ in range(n_frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        hashes.append(hashlib.md5(frame.tobytes()).hexdigest())
+    cap.release()
+    return hashes
+
+
+def measure(reader: FrameReader, targets: np.ndarray, hashes: list[str]) -> dict:
+    latencies = []
+    wrong = 0
+
+    for target in targets.tolist():
+        start = time.perf_counter()
+        frame = reader.read(target)
+        latencies.append(time.perf_counter() - start)
+
+        if frame is None or hashlib.md5(frame.tobytes()).hexdigest() != hashes[target]:
+            wrong += 1
+
+    ms = np.array(latencies) * 1e3
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "max_ms": float(ms.max()),
+        "wrong_frames": wrong,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Seek latency and accuracy of a session video, for random seeks"
+        " and for short jumps ahead like stepping through events."
+    )
+    parser.add_argument("video_path")
+    parser.add_argument("--seeks", type=int, default=100)
+    parser.add_argument(
+        "--span",
+        type=int,
+        default=3_000,
+        help="seek within the first SPAN frames, which are decoded as reference",
+    )
+    args = parser.parse_args()
+
+    keyframes = load_keyframes(args.video_path)
+    hashes = frame_hashes(args.video_path, args.span)
+
+    rng = np.random.default_rng(0)
+    patterns = {
+        "random": rng.integers(0, len(hashes), size=args.seeks),
+        # Too far ahead for the read-ahead, within a couple of GOPs
+        "jumps": np.cumsum(
+            rng.integers(FrameReader.MAX_FORWARD_STEP + 1, 40, size=args.seeks)
+        )
+        % len(hashes),
+    }
+
+    print(f"{args.video_path}: {len(hashes)} reference frames, {args.seeks} seeks")
+    if keyframes is None:
+        print("No keyframe index available")
+    else:
+        # GOP over the reference span, not the whole video
+        n_span_keyframes = int(np.searchsorted(keyframes, len(hashes)))
+        mean_gop = len(hashes) / max(n_span_keyframes, 1)
+        print(
+            f"{len(keyframes)} keyframes, {n_span_keyframes} in the reference span,"
+            f" mean GOP {mean_gop:.1f}"
+        )
+
+    strategies = {"opencv": None, "keyframe": keyframes}
+    for pattern, targets in patterns.items():
+        for name, index in strategies.items():
+            if name == "keyframe" and index is None:
+                continue
+
+            reader = FrameReader(args.video_path, keyframes=index)
+            res = measure(reader, targets, hashes)
+            reader.close()
+
+            label = f"{pattern} {name}"
+            print(
+                f"{label:>16}: p50 {res['p50_ms']:.1f} ms,"
+                f" p95 {res['p95_ms']:.1f} ms, max {res['max_ms']:.1f} ms,"
+                f" {res['wrong_frames']} wrong frames"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+import main as app
+
+from data import drawer
+from data.cache import CACHE_DIR_NAME
+from ui.startup import APP_MODULES
+
+from .synthetic import write_session
+
+
+def import_s(statement: str) -> float:
+    """Seconds a fresh interpreter takes to run `statement`, best of three."""
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def ignore_progress(stage: str, fraction: float) -> None:
+    pass
+
+
+def first_frame(path: str, parallel: bool, cached: bool) -> float:
+    """
+    Seconds from folder selection to the first frame drawn with its tracks,
+    without Tk: the start-up jobs, then one render.
+    """
+    if not cached:
+        shutil.rmtree(os.path.join(path, CACHE_DIR_NAME), ignore_errors=True)
+
+    start = time.perf_counter()
+    if parallel:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            session = pool.submit(app.load_session, path, False, ignore_progress)
+            video = pool.submit(app.open_video, path, ignore_progress)
+            data, (reader, _, frame) = session.result(), video.result()
+    else:
+        data = app.load_session(path, False, ignore_progress)
+        reader, _, frame = app.open_video(path, ignore_progress)
+
+    drawer.draw_bboxes(data.tracks, frame.copy(), 0)
+    elapsed = time.perf_counter() - start
+    reader.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Start-up cost: imports before the folder dialog and time to"
+        " first frame."
+    )
+    parser.add_argument("--frames", type=int, default=20_000)
+    args = parser.parse_args()
+
+    # Before the folder dialog: what main imports, against every app module
+    print(f"{'import main':<28} {import_s('import main'):>8.3f}s")
+    all_modules = "; ".join(f"import {m}" for m in APP_MODULES)
+    print(f"{'import all app modules':<28} {import_s(all_modules):>8.3f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_session(tmp, args.frames, video=True)
+        for cached in (False, True):
+            # Builds the session cache, or warms the OS file cache when uncached
+            first_frame(path, parallel=False, cached=cached)
+            serial = np.median([first_frame(path, False, cached) for _ in range(3)])
+            parallel = np.median([first_frame(path, True, cached) for _ in range(3)])
+            label = "first frame, " + ("cached" if cached else "uncached")
+            print(f"{label:<28} serial {serial:.3f}s, parallel {parallel:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from data import loader, repo
+
+from .synthetic import write_session
+
+
+def load(path: str, streaming: bool) -> tuple[loader.Data, float, int]:
+    """Load a session; returns it with the load time and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = loader.Data(path, use_cache=False, streaming=streaming)
+    load_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, load_s, peak
+
+
+def time_playback(data: loader.Data, n_frames: int, start: int = 0) -> np.ndarray:
+    """Per-frame lookup latency in ms while playing forward from `start`."""
+    latencies = []
+    for frame in range(start, start + n_frames):
+        t = time.perf_counter()
+        repo.get_frame_data(data.tracks, frame)
+        latencies.append(time.perf_counter() - t)
+    return np.array(latencies) * 1e3
+
+
+def time_seeks(data: loader.Data, n_seeks: int, n_frames: int, seed: int = 0):
+    """Latency in ms of random seeks, which mostly land on evicted chunks."""
+    rng = np.random.default_rng(seed)
+    latencies = []
+    for frame in rng.integers(0, n_frames, size=n_seeks).tolist():
+        t = time.perf_counter()
+        repo.get_frame_data(data.tracks, frame)
+        latencies.append(time.perf_counter() - t)
+    return np.array(latencies) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Memory and frame latency of the streaming loader against the"
+        " in-memory one."
+    )
+    parser.add_argument("--frames", type=int, default=500_000)
+    parser.add_argument("--play", type=int, default=20_000)
+    parser.add_argument("--seeks", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_session(tmp, args.frames)
+
+        print(
+            f"{'loader':<10} {'load (s)':>9} {'peak (MB)':>10} {'tracks (MB)':>12}"
+            f" {'play p50':>9} {'play max':>9} {'seek p50':>9} {'seek max':>9}"
+        )
+        for streaming in (False, True):
+            data, load_s, peak = load(path, streaming)
+            play = time_playback(data, min(args.play, args.frames))
+            seeks = time_seeks(data, args.seeks, args.frames)
+            print(
+                f"{'streaming' if streaming else 'in-memory':<10} {load_s:>9.2f}"
+                f" {peak / 1e6:>10.1f} {data.tracks.nbytes / 1e6:>12.1f}"
+                f" {np.median(play):>9.3f} {play.max():>9.2f}"
+                f" {np.median(seeks):>9.3f} {seeks.max():>9.2f}"
+            )
+            if streaming:
+                data.tracks.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import argparse
+import datetime
+import glob
+import inspect
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import numpy as np
+
+from data import loader, drawer, repo
+from data.missing import MissingDataIndex
+
+from . import synthetic
+from .synthetic import FRAME_HEIGHT, FRAME_WIDTH, write_session
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# The player's default canvas, against the synthetic video
+DISPLAY_SHAPE = (544, 728, 3)
+DISPLAY_SCALE = (728 / FRAME_WIDTH, 544 / FRAME_HEIGHT)
+
+# Saves fsync, so they are timed fewer times than the in-memory calls
+SAVE_REPEAT = 20
+
+# Slowdown against the previous run that is reported as a regression
+REGRESSION_RATIO = 1.2
+
+
+def median_ms(fn, args_list: list[tuple]) -> float:
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies) * 1e3)
+
+
+def once_ms(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1e3
+
+
+def run_scale(n_frames: int, n_animals: int, repeat: int, seed: int = 0) -> dict:
+    """Time the data layer on a synthetic session of `n_frames` frames."""
+    rng = np.random.default_rng(seed)
+    res = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_session(tmp, n_frames, n_animals=n_animals, seed=seed)
+
+        res["load_uncached_ms"] = once_ms(loader.Data, path, False)
+        res["load_build_cache_ms"] = once_ms(loader.Data, path)
+        res["load_cached_ms"] = once_ms(loader.Data, path)
+        data = loader.Data(path)
+
+        frames = rng.integers(0, n_frames, size=repeat).tolist()
+        res["get_frame_data_ms"] = median_ms(
+            repo.get_frame_data, [(data.tracks, f) for f in frames]
+        )
+
+        yolo_ids = np.unique(data.tracks.boxes[:, 4])
+        edit_ms = []
+        missing_ms = []
+        for f in frames:
+            start = time.perf_counter()
+            touched = repo.update_rfid_map(
+                data, int(rng.choice(yolo_ids)), data.rfids[0], f, f + 1_000
+            )
+            edit_ms.append((time.perf_counter() - start) * 1e3)
+            missing_ms.append(once_ms(repo.update_missing_data, data, touched))
+        res["update_rfid_map_ms"] = float(np.median(edit_ms))
+        res["update_missing_data_ms"] = float(np.median(missing_ms))
+
+        res["missing_data_index_ms"] = once_ms(MissingDataIndex, data.tracks)
+        res["get_missing_data_ms"] = median_ms(
+            repo.get_missing_data, [(data.missing_data,)] * repeat
+        )
+
+        save_ms = []
+        for f in frames[:SAVE_REPEAT]:
+            repo.update_rfid_map(data, int(yolo_ids[0]), data.rfids[0], f, f + 1_000)
+            save_ms.append(once_ms(repo.save_rfid_data, data))
+        res["save_rfid_data_ms"] = float(np.median(save_ms))
+        res["export_rfid_data_ms"] = once_ms(repo.export_rfid_data, data)
+
+        frame = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+        display = np.zeros(DISPLAY_SHAPE, dtype=np.uint8)
+        res["draw_bboxes_full_ms"] = median_ms(
+            drawer.draw_bboxes, [(data.tracks, frame.copy(), f) for f in frames]
+        )
+        res["draw_bboxes_display_ms"] = median_ms(
+            drawer.draw_bboxes,
+            [(data.tracks, display.copy(), f, DISPLAY_SCALE) for f in frames],
+        )
+
+    return res
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.node(),
+        "cpu": platform.processor() or platform.machine(),
+    }
+
+
+def synthetic_config() -> dict:
+    """What the synthetic sessions look like, besides their size."""
+    defaults = {
+        name: param.default
+        for name, param in inspect.signature(write_session).parameters.items()
+        if param.default is not inspect.Parameter.empty and name != "video"
+    }
+    return {
+        "fps": synthetic.FPS,
+        "frame_size": [FRAME_WIDTH, FRAME_HEIGHT],
+        "box_size": synthetic.BOX_SIZE,
+        "readers": synthetic.N_READERS,
+        "step_px": synthetic.STEP_PX,
+        **defaults,
+    }
+
+
+def latest_results(machine: str, config: dict) -> dict | None:
+    """
+    The most recent stored run on the same machine with the same config, the
+    only ones whose timings are comparable.
+    """
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), reverse=True):
+        with open(path) as f:
+            run = json.load(f)
+        if run["environment"]["machine"] == machine and run.get("config") == config:
+            return run
+    return None
+
+
+def compare(run: dict, previous: dict | None) -> list[str]:
+    """Table of the run, against `previous` when there is one."""
+    lines = []
+    header = f"{'frames':>9} {'benchmark':<26} {'ms':>10}"
+    if previous is not None:
+        header += f" {'previous':>10} {'ratio':>7}"
+    lines.append(header)
+
+    for scale, results in run["results"].items():
+        before = (previous or {}).get("results", {}).get(scale, {})
+        for name, ms in results.items():
+            line = f"{scale:>9} {name:<26} {ms:>10.3f}"
+            if name in before:
+                ratio = ms / before[name] if before[name] else float("inf")
+                flag = "  REGRESSION" if ratio > REGRESSION_RATIO else ""
+                line += f" {before[name]:>10.3f} {ratio:>7.2f}{flag}"
+            lines.append(line)
+
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the data layer on synthetic sessions of several sizes."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--animals", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--no-save", action="store_true", help="don't store the results"
+    )
+    args = parser.parse_args()
+
+    run = {
+        "environment": environment(),
+        "config": {
+            "animals": args.animals,
+            "repeat": args.repeat,
+            "save_repeat": SAVE_REPEAT,
+            "synthetic": synthetic_config(),
+        },
+        "results": {},
+    }
+    # Sizes are compared one by one, so they are not part of the config
+    previous = latest_results(run["environment"]["machine"], run["config"])
+
+    for n_frames in args.sizes:
+        print(f"Running {n_frames} frames...", flush=True)
+        run["results"][str(n_frames)] = run_scale(n_frames, args.animals, args.repeat)
+
+    print("\n".join(compare(run, previous)))
+    if previous is not None:
+        print(
+            f"Compared with {previous['environment']['commit']}"
+            f" ({previous['environment']['date']})"
+        )
+    else:
+        print("No earlier run with the same config on this machine to compare with")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        name = f"{stamp}_{run['environment']['commit'] or 'unknown'}.json"
+        with open(os.path.join(RESULTS_DIR, name), "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Saved to {os.path.join(RESULTS_DIR, name)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import os
+import cv2
+import numpy as np
+
+from data.loader import Data
+
+
+FPS = 30
+FRAME_WIDTH = 1280
+FRAME_HEIGHT = 960
+BOX_SIZE = 120
+N_READERS = 6
+
+# Pixels an animal moves per frame, as the std of a random walk step
+STEP_PX = 6
+
+BACKGROUND_COLOR = (90, 90, 90)
+ANIMAL_COLOR = (30, 30, 30)
+
+
+def reader_locations() -> list[tuple[int, int, int, int, int]]:
+    locations = []
+    for r in range(N_READERS):
+        x1 = 100 + (r % 3) * 400
+        y1 = 100 + (r // 3) * 600
+        locations.append((r + 1, x1, y1, x1 + 150, y1 + 150))
+    return locations
+
+
+def simulate_tracks(
+    n_frames: int,
+    n_animals: int,
+    dropout: float,
+    id_switch: float,
+    label_rate: float,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Random-walk the animals around the cage.
+
+    Returns the top-left corners (n_frames, n_animals, 2), whether each animal
+    is detected, its YOLO ID and the RFID labelling its track (-1 if none).
+    Animals go undetected with probability `dropout` per frame and come back
+    under a new YOLO ID with probability `id_switch`; each YOLO track is
+    labelled with probability `label_rate`.
+    """
+    limits = np.array([FRAME_WIDTH - BOX_SIZE, FRAME_HEIGHT - BOX_SIZE])
+    start = rng.uniform(0, limits, size=(n_animals, 2))
+    steps = rng.normal(0, STEP_PX, size=(n_frames, n_animals, 2))
+    steps[0] = start
+
+    # Reflect the walk off the cage walls
+    corners = np.cumsum(steps, axis=0) % (2 * limits)
+    corners = np.where(corners > limits, 2 * limits - corners, corners)
+    corners = corners.astype(np.int64)
+
+    detected = rng.random((n_frames, n_animals)) >= dropout
+
+    # A track that is lost may come back under a new YOLO ID
+    lost = ~detected[:-1] & detected[1:]
+    switches = np.zeros((n_frames, n_animals), dtype=bool)
+    switches[1:] = lost & (rng.random(lost.shape) < id_switch)
+    segment = np.cumsum(switches, axis=0)
+    n_segments = segment[-1] + 1
+    first_id = np.concatenate([[1], 1 + np.cumsum(n_segments)[:-1]])
+    yolo_ids = first_id + segment
+
+    rfids = np.arange(100000, 100000 + n_animals)
+    labelled = rng.random(int(n_segments.sum())) < label_rate
+    labels = np.where(labelled[yolo_ids - 1], rfids, -1)
+
+    return corners, detected, yolo_ids, labels
+
+
+def write_video(path: str, corners: np.ndarray) -> None:
+    """
+    Render the animals as dark ellipses on a plain cage floor.
+
+    Animals are drawn whether or not the tracker detected them, like in a real
+    recording.
+    """
+    size = (FRAME_WIDTH, FRAME_HEIGHT)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, size)
+    background = np.full((FRAME_HEIGHT, FRAME_WIDTH, 3), BACKGROUND_COLOR, np.uint8)
+    axes = (BOX_SIZE // 2, BOX_SIZE // 3)
+    centers = corners + BOX_SIZE // 2
+
+    for frame_centers in centers.tolist():
+        frame = background.copy()
+        for center in frame_centers:
+            cv2.ellipse(frame, tuple(center), axes, 0, 0, 360, ANIMAL_COLOR, -1)
+        writer.write(frame)
+
+    writer.release()
+
+
+def write_session(
+    path: str,
+    n_frames: int,
+    n_animals: int = 4,
+    read_rate: float = 0.2,
+    seed: int = 0,
+    dropout: float = 0.01,
+    id_switch: float = 0.2,
+    label_rate: float = 0.9,
+    video: bool = False,
+) -> str:
+    """
+    Write a synthetic session folder that `loader.Data` can open.
+
+    `read_rate` is the number of RFID reads per second across all readers. The
+    matching `raw.mp4` is only rendered with `video`.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(path, exist_ok=True)
+
+    rfids = [100000 + i for i in range(n_animals)]
+    start_time = 1_700_000_000.0
+    times = start_time + np.arange(n_frames) / FPS
+
+    corners, detected, yolo_ids, labels = simulate_tracks(
+        n_frames, n_animals, dropout, id_switch, label_rate, rng
+    )
+
+    with open(f"{path}/{Data.TRACKING_RESULTS_FILE_NAME}.csv", "w") as f:
+        f.write(",".join(Data.TRACKING_COLS) + "\n")
+        for i in range(n_frames):
+            sort_tracks = []
+            rfid_tracks = []
+            for a in np.flatnonzero(detected[i]).tolist():
+                x, y = corners[i, a].tolist()
+                box = [x, y, x + BOX_SIZE, y + BOX_SIZE]
+                sort_tracks.append(box + [int(yolo_ids[i, a])])
+                if labels[i, a] >= 0:
+                    rfid_tracks.append(box + [int(labels[i, a])])
+            f.write(f'{i + 1},{times[i]:.4f},"{sort_tracks}","{rfid_tracks}"\n')
+
+    n_reads = rng.poisson(read_rate * n_frames / FPS)
+    with open(f"{path}/rfid_reads.csv", "w") as f:
+        f.write("Timestamp,Reader,RFID\n")
+        read_times = np.sort(rng.uniform(times[0], times[-1], size=n_reads))
+        readers = rng.integers(1, N_READERS + 1, size=n_reads)
+        tags = rng.choice(rfids, size=n_reads)
+        f.writelines(
+            f"{t:.4f},{r},{tag}\n"
+            for t, r, tag in zip(read_times.tolist(), readers.tolist(), tags.tolist())
+        )
+
+    with open(f"{path}/rfid_locations.csv", "w") as f:
+        f.write("reader_id,x1,y1,x2,y2\n")
+        for location in reader_locations():
+            f.write(",".join(map(str, location)) + "\n")
+
+    with open(f"{path}/logs.txt", "w") as f:
+        f.write("Synthetic session\n")
+        f.write(f"RFID tags: {','.join(map(str, rfids))}")
+
+    if video:
+        write_video(f"{path}/{Data.VIDEO_FILE_NAME}.mp4", corners)
+
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic session folder.")
+    parser.add_argument("path")
+    parser.add_argument("--frames", type=int, default=FPS * 60 * 10)
+    parser.add_argument("--animals", type=int, default=4)
+    parser.add_argument(
+        "--read-rate", type=float, default=0.2, help="RFID reads per second"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--video", action="store_true", help="also render raw.mp4")
+    args = parser.parse_args()
+
+    write_session(
+        args.path,
+        args.frames,
+        n_animals=args.animals,
+        read_rate=args.read_rate,
+        seed=args.seed,
+        video=args.video,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import ast
+import sys
+import tempfile
+import time
+import pandas as pd
+
+from data.loader import Data
+from data.tracks import build_track_store
+
+from .synthetic import write_session
+
+
+def deep_list_size(tracks: list) -> int:
+    return sys.getsizeof(tracks) + sum(
+        sys.getsizeof(track) + sum(sys.getsizeof(v) for v in track)
+        for track in tracks
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="literal_eval vs TrackStore parsing of the track columns."
+    )
+    parser.add_argument("--frames", type=int, default=200_000)
+    parser.add_argument("--animals", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_session(tmp, args.frames, n_animals=args.animals)
+        df = pd.read_csv(f"{tmp}/{Data.TRACKING_RESULTS_FILE_NAME}.csv")
+
+    start = time.perf_counter()
+    sort_tracks = df["sort_tracks"].apply(ast.literal_eval)
+    rfid_tracks = df["RFID_tracks"].apply(ast.literal_eval)
+    literal_eval_s = time.perf_counter() - start
+    literal_eval_mb = (
+        sum(map(deep_list_size, sort_tracks)) + sum(map(deep_list_size, rfid_tracks))
+    ) / 1e6
+
+    start = time.perf_counter()
+    tracks = build_track_store(
+        df["frame"].to_numpy() - 1, df["sort_tracks"], df["RFID_tracks"]
+    )
+    store_s = time.perf_counter() - start
+    store_mb = tracks.nbytes / 1e6
+
+    print(f"{'':>14} {'parse (s)':>10} {'memory (MB)':>12}")
+    print(f"{'literal_eval':>14} {literal_eval_s:>10.2f} {literal_eval_mb:>12.1f}")
+    print(f"{'TrackStore':>14} {store_s:>10.2f} {store_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
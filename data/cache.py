@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+
+CACHE_DIR_NAME = ".tracktor_cache"
+SESSION_DIR_NAME = "session"
+MANIFEST_FILE_NAME = "manifest.json"
+
+# Bump whenever the layout of the cached arrays changes
+CACHE_VERSION = 2
+
+
+def file_signature(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class SessionCache:
+    """
+    Sidecar cache of parsed session data, stored as `.npy` files next to the session.
+
+    The cache is only valid while every source file keeps the size and mtime it
+    had when the cache was written. Arrays are memory-mapped copy-on-write, so
+    in-memory edits never reach the cache files.
+    """
+
+    def __init__(
+        self, session_path: str, sources: list[str], name: str = SESSION_DIR_NAME
+    ):
+        self.dir = os.path.join(session_path, CACHE_DIR_NAME, name)
+        self.sources = sources
+        self.manifest = self._read_manifest()
+
+    def is_valid(self) -> bool:
+        if self.manifest is None or self.manifest.get("version") != CACHE_VERSION:
+            return False
+
+        try:
+            signatures = {src: file_signature(src) for src in self.sources}
+        except OSError:
+            return False
+
+        return self.manifest.get("sources") == {
+            os.path.basename(src): sig for src, sig in signatures.items()
+        }
+
+    def load_array(self, name: str) -> np.ndarray:
+        file_path = os.path.join(self.dir, f"{name}.npy")
+        try:
+            return np.load(file_path, mmap_mode="c")
+        except ValueError:
+            # Object arrays can't be memory-mapped
+            return np.load(file_path, allow_pickle=True)
+
+    def load_frame(self, name: str) -> pd.DataFrame:
+        columns = self.manifest["frames"][name]
+        return pd.DataFrame(
+            {col: self.load_array(f"{name}.{i}") for i, col in enumerate(columns)},
+            copy=False,
+        )
+
+    def save(
+        self, arrays: dict[str, np.ndarray], frames: dict[str, pd.DataFrame]
+    ) -> None:
+        """Write the cache, replacing any previous one only once it is complete."""
+        signatures = {
+            os.path.basename(src): file_signature(src) for src in self.sources
+        }
+        tmp_dir = f"{self.dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        try:
+            os.makedirs(tmp_dir)
+
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+
+            for name, df in frames.items():
+                for i, col in enumerate(df.columns):
+                    np.save(
+                        os.path.join(tmp_dir, f"{name}.{i}.npy"),
+                        df[col].to_numpy(),
+                        allow_pickle=True,
+                    )
+
+            manifest = {
+                "version": CACHE_VERSION,
+                "sources": signatures,
+                "frames": {name: list(df.columns) for name, df in frames.items()},
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE_NAME), "w") as f:
+                json.dump(manifest, f)
+
+            shutil.rmtree(self.dir, ignore_errors=True)
+            os.replace(tmp_dir, self.dir)
+            self.manifest = manifest
+        except OSError as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"Could not write session cache: {e}")
+
+    def _read_manifest(self) -> dict | None:
+        try:
+            with open(os.path.join(self.dir, MANIFEST_FILE_NAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
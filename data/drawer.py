@@ -1,8 +1,11 @@
 import cv2
+import numpy as np
 import pandas as pd
 
 from cv2.typing import MatLike
 
+from .tracks import NO_RFID, TrackStore
+
 
 UNKNOWN_BBOX_COLOR = (0, 0, 255)
 KNOWN_BBOX_COLOR = (0, 255, 0)
@@ -10,82 +13,85 @@ BBOX_THICKNESS = 2
 
 READER_BOX_COLOR = (255, 0, 0)
 
-
-def draw_bboxes(df: pd.DataFrame, frame: MatLike, frame_number: int) -> MatLike:
-    row = df.loc[df["frame"] == frame_number].reset_index(drop=True)
-
-    try:
-        all_bboxes = row["sort_tracks"][0]
-        labeled_bboxes = row["RFID_tracks"][0]
-
-        all_bboxes.sort()
-        labeled_bboxes.sort()
-    except Exception:
+# Text styling and label offsets at full video resolution
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.9
+FONT_THICKNESS = 2
+YOLO_LABEL_OFFSET = 40
+RFID_LABEL_OFFSET = 10
+
+
+def text_style(scale: tuple[float, float]) -> tuple[float, int]:
+    """Font scale and thickness for a frame resized by `scale`."""
+    s = min(scale)
+    return FONT_SCALE * s, max(1, round(FONT_THICKNESS * s))
+
+
+def draw_bboxes(
+    tracks: TrackStore,
+    frame: MatLike,
+    frame_number: int,
+    scale: tuple[float, float] = (1.0, 1.0),
+) -> MatLike:
+    """Draw the tracks of a frame; `scale` maps video to `frame` coordinates."""
+    boxes, rfids = tracks.frame_tracks(frame_number)
+    if len(boxes) == 0:
         return frame
 
-    j = 0
+    sx, sy = scale
+    coords = np.rint(boxes[:, :4] * (sx, sy, sx, sy)).astype(int)
+    font_scale, font_thickness = text_style(scale)
+    yolo_offset = round(YOLO_LABEL_OFFSET * sy)
+    rfid_offset = round(RFID_LABEL_OFFSET * sy)
 
-    for i in range(len(all_bboxes)):
-        x1, y1, x2, y2 = all_bboxes[i][0:4]
-        yolo_id = all_bboxes[i][4]
-
-        # If they reference the same bounding box
-        if j < len(labeled_bboxes) and all_bboxes[i][0:4] == labeled_bboxes[j][0:4]:
-            rfid = labeled_bboxes[j][4]
-            frame = cv2.rectangle(
-                frame, (x1, y1), (x2, y2), KNOWN_BBOX_COLOR, BBOX_THICKNESS
-            )
-            frame = cv2.putText(
-                frame,
-                f"YOLO ID: {yolo_id}",
-                (x1, y1 - 40),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.9,
-                KNOWN_BBOX_COLOR,
-                2,
-            )
-            frame = cv2.putText(
-                frame,
-                f"RFID: {rfid}",
-                (x1, y1 - 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.9,
-                KNOWN_BBOX_COLOR,
-                2,
-            )
-            j += 1
+    for (x1, y1, x2, y2), yolo_id, rfid in zip(
+        coords.tolist(), boxes[:, 4].tolist(), rfids.tolist()
+    ):
+        # If the box carries an RFID
+        if rfid != NO_RFID:
+            color = KNOWN_BBOX_COLOR
+            label = f"RFID: {rfid}"
 
         # Else
         else:
-            frame = cv2.rectangle(
-                frame, (x1, y1), (x2, y2), UNKNOWN_BBOX_COLOR, BBOX_THICKNESS
-            )
-            frame = cv2.putText(
-                frame,
-                f"YOLO ID: {yolo_id}",
-                (x1, y1 - 40),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.9,
-                UNKNOWN_BBOX_COLOR,
-                2,
-            )
-            frame = cv2.putText(
-                frame,
-                "Unknown",
-                (x1, y1 - 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.9,
-                UNKNOWN_BBOX_COLOR,
-                2,
-            )
+            color = UNKNOWN_BBOX_COLOR
+            label = "Unknown"
+
+        frame = cv2.rectangle(frame, (x1, y1), (x2, y2), color, BBOX_THICKNESS)
+        frame = cv2.putText(
+            frame,
+            f"YOLO ID: {yolo_id}",
+            (x1, y1 - yolo_offset),
+            FONT,
+            font_scale,
+            color,
+            font_thickness,
+        )
+        frame = cv2.putText(
+            frame,
+            label,
+            (x1, y1 - rfid_offset),
+            FONT,
+            font_scale,
+            color,
+            font_thickness,
+        )
 
     return frame
 
 
-def draw_rfid_reader_locations(rfid_reader_locations: pd.DataFrame, frame: MatLike):
-    for _, row in rfid_reader_locations.iterrows():
-        reader_id = str(row["reader_id"])
-        x1, y1, x2, y2 = int(row["x1"]), int(row["y1"]), int(row["x2"]), int(row["y2"])
+def draw_rfid_reader_locations(
+    rfid_reader_locations: pd.DataFrame,
+    frame: MatLike,
+    scale: tuple[float, float] = (1.0, 1.0),
+):
+    sx, sy = scale
+    font_scale, font_thickness = text_style(scale)
+
+    for row in rfid_reader_locations.itertuples(index=False):
+        reader_id = str(row.reader_id)
+        x1, y1 = round(row.x1 * sx), round(row.y1 * sy)
+        x2, y2 = round(row.x2 * sx), round(row.y2 * sy)
 
         frame = cv2.rectangle(
             frame, (x1, y1), (x2, y2), READER_BOX_COLOR, BBOX_THICKNESS
@@ -95,7 +101,7 @@ def draw_rfid_reader_locations(rfid_reader_locations: pd.DataFrame, frame: MatLi
         center_y = (y1 + y2) // 2
 
         text_size = cv2.getTextSize(
-            f"Reader ID: {reader_id}", cv2.FONT_HERSHEY_SIMPLEX, 0.9, 2
+            f"Reader ID: {reader_id}", FONT, font_scale, font_thickness
         )
         text_width, text_height = text_size[0]
 
@@ -106,10 +112,46 @@ def draw_rfid_reader_locations(rfid_reader_locations: pd.DataFrame, frame: MatLi
             frame,
             f"Reader ID: {reader_id}",
             (text_x, text_y),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.9,
+            FONT,
+            font_scale,
             READER_BOX_COLOR,
-            2,
+            font_thickness,
         )
 
     return frame
+
+
+class ReaderLayer:
+    """
+    RFID reader locations pre-rendered once per frame size and scale.
+
+    The readers never move, so the layer is drawn a single time and kept as the
+    flat positions and colours of the pixels it covers, which every frame only
+    has to copy in.
+    """
+
+    def __init__(self, rfid_reader_locations: pd.DataFrame):
+        self.rfid_reader_locations = rfid_reader_locations
+        self._layers: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}
+
+    def render(
+        self, shape: tuple, scale: tuple[float, float]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        key = (shape, scale)
+        if key not in self._layers:
+            image = draw_rfid_reader_locations(
+                self.rfid_reader_locations, np.zeros(shape, dtype=np.uint8), scale
+            )
+            pixels = image.reshape(-1, shape[-1])
+            mask = np.flatnonzero(np.any(pixels != 0, axis=-1))
+            self._layers[key] = (mask, pixels[mask])
+
+        return self._layers[key]
+
+    def draw(
+        self, frame: MatLike, scale: tuple[float, float] = (1.0, 1.0)
+    ) -> MatLike:
+        mask, colors = self.render(frame.shape, scale)
+        frame = np.ascontiguousarray(frame)
+        frame.reshape(-1, frame.shape[-1])[mask] = colors
+        return frame
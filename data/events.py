@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class EventTable:
+    """
+    Events kept as columnar arrays and labelled on demand.
+
+    Every event has a `frame`; `template` is formatted with the event's columns
+    only when its label is displayed, so building a table costs nothing per
+    event.
+    """
+
+    def __init__(self, template: str, frame: np.ndarray, **columns: np.ndarray):
+        self.template = template
+        self.columns = {"frame": frame, **columns}
+
+    def __len__(self) -> int:
+        return len(self.columns["frame"])
+
+    def frame(self, i: int) -> int:
+        return int(self.columns["frame"][i])
+
+    def label(self, i: int) -> str:
+        return self.template.format(
+            **{name: int(values[i]) for name, values in self.columns.items()}
+        )
+
+    def patch(self, removed: "EventTable", added: "EventTable") -> None:
+        """Remove and insert events by frame; all tables must be sorted by frame."""
+        frames = self.columns["frame"]
+        removed_frames = removed.columns["frame"]
+        idx = np.searchsorted(frames, removed_frames)
+        found = idx < len(frames)
+        found[found] = frames[idx[found]] == removed_frames[found]
+
+        columns = {
+            name: np.delete(values, idx[found])
+            for name, values in self.columns.items()
+        }
+
+        at = np.searchsorted(columns["frame"], added.columns["frame"])
+        self.columns = {
+            name: np.insert(values, at, added.columns[name])
+            for name, values in columns.items()
+        }
@@ -0,0 +1,92 @@
+import numpy as np
+
+from .streaming import StreamingTrackStore
+from .tracks import TrackStore, replace_segments
+
+
+class TrackIntervals:
+    """
+    Lifetime, gaps and RFID runs of every YOLO track.
+
+    Tracks are kept as maximal segments of consecutive frames carrying the same
+    RFID, sorted by YOLO ID then frame, with `offsets` locating the segments of
+    each ID. Everything else is derived from the segments of one track, so
+    queries never scan the tracking rows. `update` recomputes the segments of
+    the tracks an edit touched.
+    """
+
+    def __init__(self, tracks: TrackStore | StreamingTrackStore):
+        self.tracks = tracks
+        self._set(tracks.track_segments())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def span(self, yolo_id: int) -> tuple[int, int] | None:
+        """First and last frame of `yolo_id`."""
+        starts, ends, _ = self.segments(yolo_id)
+        if len(starts) == 0:
+            return None
+        return int(starts[0]), int(ends[-1])
+
+    def segments(self, yolo_id: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """First frames, last frames and RFIDs of the segments of `yolo_id`."""
+        i = np.searchsorted(self.ids, yolo_id)
+        if i == len(self.ids) or self.ids[i] != yolo_id:
+            lo = hi = 0
+        else:
+            lo, hi = self.offsets[i], self.offsets[i + 1]
+        return self.starts[lo:hi], self.ends[lo:hi], self.rfids[lo:hi]
+
+    def gaps(self, yolo_id: int) -> np.ndarray:
+        """(first, last) frame of every stretch `yolo_id` goes undetected."""
+        starts, ends, _ = self.segments(yolo_id)
+        gap = starts[1:] > ends[:-1] + 1
+        return np.column_stack([ends[:-1][gap] + 1, starts[1:][gap] - 1])
+
+    def rfid_runs(self, yolo_id: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        First frames, last frames and RFIDs of the runs of `yolo_id` keeping the
+        same RFID, across gaps.
+        """
+        starts, ends, rfids = self.segments(yolo_id)
+        if len(starts) == 0:
+            return starts, ends, rfids
+
+        first = np.flatnonzero(np.concatenate([[True], rfids[1:] != rfids[:-1]]))
+        last = np.append(first[1:], len(starts)) - 1
+        return starts[first], ends[last], rfids[first]
+
+    def run_at(self, yolo_id: int, frame: int) -> tuple[int, int, int] | None:
+        """The RFID run of `yolo_id` holding `frame`, or the last one before it."""
+        starts, ends, rfids = self.rfid_runs(yolo_id)
+        i = np.searchsorted(starts, frame, side="right") - 1
+        if i < 0:
+            return None
+        return int(starts[i]), int(ends[i]), int(rfids[i])
+
+    def next_rfid_change(self, yolo_id: int, frame: int) -> int | None:
+        """First frame after `frame` where `yolo_id` changes RFID."""
+        starts, _, _ = self.rfid_runs(yolo_id)
+        i = np.searchsorted(starts, frame, side="right")
+        if i == len(starts):
+            return None
+        return int(starts[i])
+
+    def update(self, yolo_id: int) -> None:
+        """Recompute the segments of `yolo_id` after an edit."""
+        i = np.searchsorted(self.ids, yolo_id)
+        if i == len(self.ids) or self.ids[i] != yolo_id:
+            return
+
+        new = self.tracks.yolo_segments(yolo_id)
+        segments = (self.yolo_ids, self.starts, self.ends, self.rfids)
+        self.yolo_ids, self.starts, self.ends, self.rfids = replace_segments(
+            segments, yolo_id, new
+        )
+        self.offsets[i + 1 :] += len(new[0]) - (self.offsets[i + 1] - self.offsets[i])
+
+    def _set(self, segments: tuple[np.ndarray, ...]) -> None:
+        self.yolo_ids, self.starts, self.ends, self.rfids = segments
+        self.ids, first = np.unique(self.yolo_ids, return_index=True)
+        self.offsets = np.append(first, len(self.yolo_ids))
@@ -0,0 +1,364 @@
+import json
+import os
+import shutil
+import numpy as np
+
+from .cache import file_signature
+from .streaming import StreamingTrackStore
+from .tracks import TrackStore
+
+
+JOURNAL_FILE_SUFFIX = "_edits.jsonl"
+SNAPSHOT_FILE_SUFFIX = "_edits.npy"
+SIGNATURE_FILE_SUFFIX = "_edits.json"
+
+# Snapshots written before they could be memory-mapped
+LEGACY_SNAPSHOT_FILE_SUFFIX = "_edits.npz"
+
+# Journal records that are not replayed are moved aside to `<journal><suffix>`
+REJECTED_FILE_SUFFIX = ".rejected"
+
+SET_RECORD_KEYS = ("yolo_id", "rfid", "from", "to")
+
+# Bytes read at a time when looking for the end of the last whole record
+TAIL_BLOCK_BYTES = 1 << 16
+
+
+def resolve_records(records: list[dict]) -> tuple[list[dict], list[dict]]:
+    """Fold undo/redo records into the edits in effect and the redoable ones."""
+    done: list[dict] = []
+    undone: list[dict] = []
+
+    for record in records:
+        if record["op"] == "set":
+            done.append(record)
+            undone.clear()
+        elif record["op"] == "undo" and done:
+            undone.append(done.pop())
+        elif record["op"] == "redo" and undone:
+            done.append(undone.pop())
+
+    return done, undone
+
+
+def cut_torn_tail(path: str) -> bool:
+    """
+    Truncate `path` back to its last newline; returns True if anything was cut.
+
+    A record only counts once its newline is on disk, so whatever follows the
+    last one is what a crash mid-append left behind.
+    """
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        return False
+
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        keep = 0
+        pos = end
+        while pos > 0:
+            start = max(0, pos - TAIL_BLOCK_BYTES)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            pos = start
+
+        if keep == end:
+            return False
+
+        f.truncate(keep)
+        f.flush()
+        os.fsync(f.fileno())
+        return True
+
+
+def parse_record(line: bytes) -> dict:
+    """
+    One journal line; raises ValueError (JSONDecodeError included), KeyError or
+    TypeError if it is corrupt.
+    """
+    record = json.loads(line)
+    if record["op"] == "set":
+        missing = [key for key in SET_RECORD_KEYS if key not in record]
+        if missing:
+            raise KeyError(missing[0])
+    return record
+
+
+class EditJournal:
+    """
+    Append-only log of the RFID edits made to a session, with undo and redo.
+
+    Every edit is kept as a small (yolo_id, rfid, from, to) record that is
+    appended to `<base>_edits.jsonl` on flush and replayed on top of the base
+    tracking file on load. The journal opens with a header holding the base
+    file's signature, and is set aside rather than replayed onto another file.
+    Compaction folds the log into a snapshot of the RFID column so replay stays
+    short. The snapshot is written and memory-mapped one piece at a time, so it
+    works for stores that are not fully resident.
+    """
+
+    def __init__(self, tracks: "TrackStore | StreamingTrackStore", base_path: str):
+        self.tracks = tracks
+        self.base_path = base_path
+        root, _ = os.path.splitext(base_path)
+        self.journal_path = root + JOURNAL_FILE_SUFFIX
+        self.snapshot_path = root + SNAPSHOT_FILE_SUFFIX
+        self.signature_path = root + SIGNATURE_FILE_SUFFIX
+        self.legacy_snapshot_path = root + LEGACY_SNAPSHOT_FILE_SUFFIX
+
+        # (record, detections, previous rfids) of the applied edits
+        self._done: list[tuple[dict, np.ndarray, np.ndarray]] = []
+        self._undone: list[dict] = []
+        self._unflushed: list[dict] = []
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def can_undo(self) -> bool:
+        return bool(self._done)
+
+    def can_redo(self) -> bool:
+        return bool(self._undone)
+
+    def has_unsaved_changes(self) -> bool:
+        return bool(self._unflushed)
+
+    def undo_record(self) -> dict | None:
+        """The edit `undo` would revert."""
+        return self._done[-1][0] if self._done else None
+
+    def redo_record(self) -> dict | None:
+        """The edit `redo` would re-apply."""
+        return self._undone[-1] if self._undone else None
+
+    def apply(
+        self,
+        yolo_id: int,
+        rfid: int,
+        from_: int | None = None,
+        to_: int | None = None,
+    ) -> np.ndarray:
+        """Apply and log an edit; returns the frames it touched."""
+        record = {
+            "op": "set",
+            "yolo_id": yolo_id,
+            "rfid": rfid,
+            "from": from_,
+            "to": to_,
+        }
+        self._undone.clear()
+        self._unflushed.append(record)
+        return self._apply(record)
+
+    def undo(self) -> np.ndarray | None:
+        if not self._done:
+            return None
+
+        record, detections, previous = self._done.pop()
+        self.tracks.restore_rfids(detections, previous)
+        self._undone.append(record)
+        self._unflushed.append({"op": "undo"})
+        return self.tracks.detection_frames(detections)
+
+    def redo(self) -> np.ndarray | None:
+        if not self._undone:
+            return None
+
+        record = self._undone.pop()
+        self._unflushed.append({"op": "redo"})
+        return self._apply(record)
+
+    def flush(self) -> None:
+        """Append the records made since the last flush to the journal file."""
+        records = self.take_unflushed()
+        try:
+            self.write_records(records)
+        except OSError:
+            self.restore_unflushed(records)
+            raise
+
+    def take_unflushed(self) -> list[dict]:
+        """Hand over the records made since the last flush, for `write_records`."""
+        records = self._unflushed
+        self._unflushed = []
+        return records
+
+    def restore_unflushed(self, records: list[dict]) -> None:
+        """Put back records whose write failed, ahead of any made since."""
+        self._unflushed[:0] = records
+
+    def write_records(self, records: list[dict]) -> None:
+        """
+        Append `records` to the journal file in a single write.
+
+        Only touches the file, so it may run on a worker thread. A crash mid-write
+        leaves at most a torn last line, which is cut before the next append and
+        on replay.
+        """
+        if not records:
+            return
+
+        cut_torn_tail(self.journal_path)
+        if not os.path.exists(self.journal_path) or not os.path.getsize(
+            self.journal_path
+        ):
+            header = {"op": "header", "source": file_signature(self.base_path)}
+            records = [header, *records]
+
+        with open(self.journal_path, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replay(self) -> None:
+        """Bring the store up to date with the snapshot and journal on disk."""
+        self._load_snapshot()
+
+        try:
+            if cut_torn_tail(self.journal_path):
+                print(f"Dropped a truncated last record from {self.journal_path}")
+            with open(self.journal_path, "rb") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+
+        # Replay stops at a corrupt record; it and the rest are set aside so
+        # later saves are not appended behind it
+        records = []
+        valid_bytes = 0
+        for n, line in enumerate(lines, start=1):
+            if line.strip():
+                try:
+                    records.append(parse_record(line))
+                except (ValueError, KeyError, TypeError):
+                    print(
+                        f"Corrupt record on line {n} of {self.journal_path}:"
+                        " replaying the edits before it"
+                    )
+                    self._set_aside(valid_bytes)
+                    break
+            valid_bytes += len(line)
+
+        # Journals written before the header are replayed unchecked
+        if records and records[0]["op"] == "header":
+            header = records.pop(0)
+            try:
+                matches = header.get("source") == file_signature(self.base_path)
+            except OSError:
+                matches = False
+            if not matches:
+                print(
+                    f"Ignoring {self.journal_path}: it was written for another"
+                    " version of the tracking file"
+                )
+                self._set_aside(0)
+                return
+
+        done, self._undone = resolve_records(records)
+        for record in done:
+            self._apply(record)
+
+    def compact(self) -> None:
+        """Fold every edit into the snapshot and start an empty journal."""
+        tmp_path = self.snapshot_path + ".tmp.npy"
+        snapshot = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.int64, shape=(self.tracks.n_detections,)
+        )
+        start = 0
+        for rfids in self.tracks.rfid_chunks():
+            snapshot[start : start + len(rfids)] = rfids
+            start += len(rfids)
+        snapshot.flush()
+        del snapshot
+        os.replace(tmp_path, self.snapshot_path)
+
+        # The signature goes last: a snapshot without a matching one is ignored
+        tmp_path = self.signature_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "source": file_signature(self.base_path),
+                    "snapshot": file_signature(self.snapshot_path),
+                },
+                f,
+            )
+        os.replace(tmp_path, self.signature_path)
+
+        if os.path.exists(self.legacy_snapshot_path):
+            os.remove(self.legacy_snapshot_path)
+
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+        self._done.clear()
+        self._undone.clear()
+        self._unflushed.clear()
+
+    def _set_aside(self, keep: int) -> None:
+        """Copy the journal to its rejected file and cut it to `keep` bytes."""
+        rejected_path = self.journal_path + REJECTED_FILE_SUFFIX
+        try:
+            shutil.copyfile(self.journal_path, rejected_path)
+            if keep:
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(keep)
+            else:
+                os.remove(self.journal_path)
+        except OSError as e:
+            print(f"Could not set aside {self.journal_path}: {e}")
+            return
+
+        print(f"The records not replayed are kept in {rejected_path}")
+
+    def _apply(self, record: dict) -> np.ndarray:
+        detections, previous = self.tracks.set_rfid(
+            record["yolo_id"], record["rfid"], record["from"], record["to"]
+        )
+        self._done.append((record, detections, previous))
+        return self.tracks.detection_frames(detections)
+
+    def _load_snapshot(self) -> None:
+        if not os.path.exists(self.signature_path):
+            self._load_legacy_snapshot()
+            return
+
+        try:
+            with open(self.signature_path) as f:
+                signature = json.load(f)
+            valid = signature == {
+                "source": file_signature(self.base_path),
+                "snapshot": file_signature(self.snapshot_path),
+            }
+            if valid:
+                snapshot = np.load(self.snapshot_path, mmap_mode="r")
+                valid = len(snapshot) == self.tracks.n_detections
+        except (OSError, ValueError):
+            return
+
+        if valid:
+            self.tracks.set_base_rfids(snapshot)
+        else:
+            print(f"Ignoring {self.snapshot_path}: the tracking file changed")
+
+    def _load_legacy_snapshot(self) -> None:
+        try:
+            with np.load(self.legacy_snapshot_path) as snapshot:
+                signature = file_signature(self.base_path)
+                valid = (
+                    int(snapshot["size"]) == signature["size"]
+                    and int(snapshot["mtime_ns"]) == signature["mtime_ns"]
+                    and len(snapshot["rfids"]) == self.tracks.n_detections
+                )
+                if valid:
+                    self.tracks.set_base_rfids(snapshot["rfids"])
+                else:
+                    print(
+                        f"Ignoring {self.legacy_snapshot_path}:"
+                        " the tracking file changed"
+                    )
+        except OSError:
+            pass
@@ -0,0 +1,160 @@
+import os
+import struct
+import numpy as np
+
+from .cache import CACHE_DIR_NAME, file_signature
+
+
+KEYFRAMES_FILE_SUFFIX = ".keyframes.npz"
+
+
+def iter_boxes(buf: bytes, start: int = 0, end: int | None = None):
+    """Yield (type, payload start, payload end) of the MP4 boxes in `buf`."""
+    end = len(buf) if end is None else end
+    pos = start
+
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", buf, pos + 8)
+            header = 16
+        elif size == 0:
+            size = end - pos
+
+        if size < header:
+            return
+
+        yield box_type, pos + header, min(pos + size, end)
+        pos += size
+
+
+def read_moov(video_path: str) -> bytes | None:
+    """Read the `moov` box of an MP4 without touching the media data."""
+    with open(video_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        pos = 0
+
+        while pos + 8 <= file_size:
+            f.seek(pos)
+            header = f.read(16)
+            size, box_type = struct.unpack_from(">I4s", header)
+            header_size = 8
+
+            if size == 1:
+                (size,) = struct.unpack_from(">Q", header, 8)
+                header_size = 16
+            elif size == 0:
+                size = file_size - pos
+
+            if size < header_size:
+                return None
+
+            if box_type == b"moov":
+                f.seek(pos + header_size)
+                return f.read(size - header_size)
+
+            pos += size
+
+    return None
+
+
+def find_video_stbl(moov: bytes) -> tuple[int, int] | None:
+    """Payload range of the sample table of the first video track."""
+    for box_type, start, end in iter_boxes(moov):
+        if box_type != b"trak":
+            continue
+
+        mdia = _find_child(moov, start, end, b"mdia")
+        if mdia is None:
+            continue
+
+        hdlr = _find_child(moov, *mdia, b"hdlr")
+        if hdlr is None or moov[hdlr[0] + 8 : hdlr[0] + 12] != b"vide":
+            continue
+
+        minf = _find_child(moov, *mdia, b"minf")
+        stbl = minf and _find_child(moov, *minf, b"stbl")
+        if stbl:
+            return stbl
+
+    return None
+
+
+def parse_keyframes(video_path: str) -> np.ndarray | None:
+    """
+    Frame numbers of the sync samples of an MP4's video track.
+
+    Frames are numbered in decode order, which matches presentation order for
+    the streams our cameras record (no B-frames). Returns None if the file
+    can't be parsed as an MP4.
+    """
+    try:
+        return _parse_keyframes(video_path)
+    except (OSError, struct.error, ValueError):
+        # Unreadable, truncated or malformed: seeks fall back to OpenCV
+        return None
+
+
+def _parse_keyframes(video_path: str) -> np.ndarray | None:
+    moov = read_moov(video_path)
+    stbl = moov and find_video_stbl(moov)
+    if not stbl:
+        return None
+
+    stss = _find_child(moov, *stbl, b"stss")
+    if stss is not None:
+        (count,) = struct.unpack_from(">I", moov, stss[0] + 4)
+        samples = np.frombuffer(moov, dtype=">u4", count=count, offset=stss[0] + 8)
+        return samples.astype(np.int64) - 1
+
+    # No sync sample table means every sample is a keyframe
+    stsz = _find_child(moov, *stbl, b"stsz")
+    if stsz is None:
+        return None
+
+    (count,) = struct.unpack_from(">I", moov, stsz[0] + 8)
+    return np.arange(count, dtype=np.int64)
+
+
+def load_keyframes(video_path: str) -> np.ndarray | None:
+    """Keyframe index of a video, cached next to it and rebuilt when it changes."""
+    try:
+        signature = file_signature(video_path)
+    except OSError:
+        return None
+
+    cache_dir = os.path.join(os.path.dirname(video_path), CACHE_DIR_NAME)
+    cache_path = os.path.join(
+        cache_dir, os.path.basename(video_path) + KEYFRAMES_FILE_SUFFIX
+    )
+
+    try:
+        with np.load(cache_path) as cached:
+            if (
+                int(cached["size"]) == signature["size"]
+                and int(cached["mtime_ns"]) == signature["mtime_ns"]
+            ):
+                return cached["keyframes"]
+    except (OSError, KeyError, ValueError):
+        pass
+
+    keyframes = parse_keyframes(video_path)
+    if keyframes is None:
+        return None
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(cache_path, keyframes=keyframes, **signature)
+    except OSError as e:
+        print(f"Could not write keyframe index: {e}")
+
+    return keyframes
+
+
+def _find_child(buf: bytes, start: int, end: int, box_type: bytes):
+    for child_type, child_start, child_end in iter_boxes(buf, start, end):
+        if child_type == box_type:
+            return child_start, child_end
+    return None
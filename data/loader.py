@@ -1,25 +1,214 @@
-import ast
+import io
 import os
+import numpy as np
 import pandas as pd
 
+from collections.abc import Callable
 from typing import cast
 
+from .cache import SESSION_DIR_NAME, SessionCache
+from .intervals import TrackIntervals
+from .journal import EditJournal
+from .keyframes import load_keyframes
+from .missing import MissingDataIndex
+from .streaming import StreamingTrackStore, index_rows
+from .tracks import TrackStore, build_track_store, merge_segments, row_numbers
 
-def parse_tracking_data(df: pd.DataFrame) -> pd.DataFrame:
+
+STREAM_CACHE_DIR_NAME = "stream"
+STREAM_ARRAYS = [
+    "columns",
+    "byte_offsets",
+    "row_starts",
+    "frames",
+    "track_counts",
+    "labelled_counts",
+    "yolo_ids",
+    "yolo_rows",
+    "segment_yolo",
+    "segment_start",
+    "segment_end",
+    "segment_rfid",
+]
+
+
+def parse_tracking_data(df: pd.DataFrame) -> tuple[pd.DataFrame, TrackStore]:
     df = cast(pd.DataFrame, df[Data.TRACKING_COLS])
-    df["frame"] = df["frame"].astype(int) - 1
-    df["sort_tracks"] = df["sort_tracks"].apply(ast.literal_eval)
-    df["RFID_tracks"] = df["RFID_tracks"].apply(ast.literal_eval)
-    return df
+    frames = df["frame"].to_numpy(dtype=np.int64) - 1
+    tracks = build_track_store(frames, df["sort_tracks"], df["RFID_tracks"])
+
+    df = pd.DataFrame({"frame": frames, "Time": df["Time"].to_numpy()})
+    return df, tracks
+
+
+def read_tracking_chunk(
+    path: str, columns: list[str], byte_offsets: np.ndarray, k: int
+) -> tuple[pd.DataFrame, TrackStore]:
+    """Parse the rows of chunk `k` of a tracking file indexed by `index_rows`."""
+    with open(path, "rb") as f:
+        f.seek(byte_offsets[k])
+        raw = f.read(byte_offsets[k + 1] - byte_offsets[k])
+
+    df = pd.read_csv(
+        io.BytesIO(raw), header=None, names=columns, usecols=Data.TRACKING_COLS
+    )
+    return parse_tracking_data(df)
+
+
+def index_tracking_data(
+    path: str, progress: Callable[[float], None] | None = None
+) -> tuple[pd.DataFrame, dict[str, np.ndarray]]:
+    """
+    Parse a tracking file a chunk at a time, keeping only what streaming needs.
+
+    Returns the frame and time of every row, and the arrays a
+    StreamingTrackStore is built from. `progress` gets the fraction of chunks
+    parsed.
+    """
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    byte_offsets = index_rows(path)
+
+    dfs = []
+    track_counts = []
+    labelled_counts = []
+    row_starts = [0]
+    yolo_ids = []
+    yolo_first = []
+    yolo_last = []
+    segments = [tuple(np.empty(0, dtype=np.int64) for _ in range(4))]
+
+    for k in range(len(byte_offsets) - 1):
+        df, tracks = read_tracking_chunk(path, columns, byte_offsets, k)
+        dfs.append(df)
+        track_counts.append(tracks.track_counts().astype(np.int32))
+        labelled_counts.append(tracks.labelled_counts().astype(np.int32))
+
+        ids = tracks.boxes[:, 4]
+        rows = row_numbers(tracks.offsets) + row_starts[-1]
+        unique, first = np.unique(ids, return_index=True)
+        _, last = np.unique(ids[::-1], return_index=True)
+        yolo_ids.append(unique)
+        yolo_first.append(rows[first])
+        yolo_last.append(rows[len(ids) - 1 - last])
+        segments.append(tracks.track_segments())
+
+        row_starts.append(row_starts[-1] + len(tracks))
+        if progress is not None:
+            progress((k + 1) / (len(byte_offsets) - 1))
+
+    # A YOLO ID may span several chunks
+    ids = np.concatenate(yolo_ids) if yolo_ids else np.empty(0, dtype=np.int32)
+    order = np.argsort(ids, kind="stable")
+    unique, starts = np.unique(ids[order], return_index=True)
+    if len(unique):
+        first = np.minimum.reduceat(np.concatenate(yolo_first)[order], starts)
+        last = np.maximum.reduceat(np.concatenate(yolo_last)[order], starts)
+    else:
+        first = last = np.empty(0, dtype=np.int64)
+
+    # Segments of a track are cut at chunk boundaries until merged
+    segment_yolo, segment_start, segment_end, segment_rfid = merge_segments(
+        *(np.concatenate(c) for c in zip(*segments))
+    )
+
+    df = (
+        pd.concat(dfs, ignore_index=True)
+        if dfs
+        else pd.DataFrame({"frame": np.empty(0, dtype=np.int64), "Time": []})
+    )
+    arrays = {
+        "columns": np.array(columns),
+        "byte_offsets": byte_offsets,
+        "row_starts": np.array(row_starts, dtype=np.int64),
+        "frames": df["frame"].to_numpy(),
+        "track_counts": np.concatenate(track_counts + [np.empty(0, np.int32)]),
+        "labelled_counts": np.concatenate(labelled_counts + [np.empty(0, np.int32)]),
+        "yolo_ids": unique,
+        "yolo_rows": np.column_stack([first, last]).astype(np.int64),
+        "segment_yolo": segment_yolo,
+        "segment_start": segment_start,
+        "segment_end": segment_end,
+        "segment_rfid": segment_rfid,
+    }
+    return df, arrays
+
+
+def streaming_track_store(
+    path: str, arrays: dict[str, np.ndarray]
+) -> StreamingTrackStore:
+    def read_chunk(k: int) -> TrackStore:
+        return read_tracking_chunk(
+            path, list(arrays["columns"]), arrays["byte_offsets"], k
+        )[1]
+
+    return StreamingTrackStore(
+        read_chunk,
+        arrays["row_starts"],
+        arrays["frames"],
+        arrays["track_counts"],
+        arrays["labelled_counts"],
+        arrays["yolo_ids"],
+        arrays["yolo_rows"],
+        (
+            arrays["segment_yolo"],
+            arrays["segment_start"],
+            arrays["segment_end"],
+            arrays["segment_rfid"],
+        ),
+    )
+
+
+def align_timestamps(
+    times: np.ndarray, query: np.ndarray, max_gap: float | None = None
+) -> np.ndarray:
+    """
+    Position in `times` of the nearest timestamp to every value of `query`.
+
+    Ties go to the earliest row, matching `idxmin`. Queries further than
+    `max_gap` from any timestamp are flagged with -1 instead of being snapped.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    query = np.asarray(query, dtype=np.float64)
+    if len(times) == 0:
+        return np.full(len(query), -1, dtype=np.int64)
+
+    order = np.argsort(times, kind="stable")
+    sorted_times = times[order]
+
+    last = len(times) - 1
+    right = np.clip(np.searchsorted(sorted_times, query, side="left"), 0, last)
+    left = np.clip(right - 1, 0, last)
+
+    # First row holding the left neighbour's value
+    left = np.searchsorted(sorted_times, sorted_times[left], side="left")
+
+    left_gap = np.abs(query - sorted_times[left])
+    right_gap = np.abs(sorted_times[right] - query)
+    use_left = (left_gap < right_gap) | (
+        (left_gap == right_gap) & (order[left] < order[right])
+    )
+    nearest = np.where(use_left, left, right)
+
+    positions = order[nearest]
+    if max_gap is not None:
+        gap = np.where(use_left, left_gap, right_gap)
+        positions[gap > max_gap] = -1
+    return positions
 
 
 def parse_rfid_readings(
-    rfid_reads_df: pd.DataFrame, tracking_df: pd.DataFrame
+    rfid_reads_df: pd.DataFrame,
+    tracking_df: pd.DataFrame,
+    max_gap: float | None = None,
 ) -> pd.DataFrame:
     rfid_reads_df = cast(pd.DataFrame, rfid_reads_df)
-    rfid_reads_df["frame"] = rfid_reads_df["Timestamp"].apply(
-        lambda x: tracking_df.iloc[(tracking_df["Time"] - x).abs().idxmin()]["frame"]
+    positions = align_timestamps(
+        tracking_df["Time"].to_numpy(), rfid_reads_df["Timestamp"].to_numpy(), max_gap
     )
+    frames = tracking_df["frame"].to_numpy()[positions]
+    frames[positions < 0] = -1
+
+    rfid_reads_df["frame"] = frames
     rfid_reads_df["Reader"] = rfid_reads_df["Reader"].astype(int)
     rfid_reads_df["RFID"] = rfid_reads_df["RFID"].astype(int)
     rfid_reads_df["frame"] = rfid_reads_df["frame"].astype(int)
@@ -40,22 +229,147 @@ class Data:
 
     TRACKING_COLS = ["frame", "Time", "sort_tracks", "RFID_tracks"]
 
-    def __init__(self, path):
+    # Largest gap in seconds between a read and its frame; further reads get -1
+    MAX_READ_GAP: float | None = None
+
+    # Share of the load progress taken by parsing, replaying edits and indexing
+    LOAD_STAGES = {"parse": 0.8, "replay": 0.15, "index": 0.05}
+
+    def __init__(
+        self,
+        path,
+        use_cache: bool = True,
+        streaming: bool = False,
+        progress: Callable[[str, float], None] | None = None,
+    ):
+        """
+        With `streaming`, the tracks are parsed a chunk at a time as they are
+        needed instead of all being held in memory, see StreamingTrackStore.
+        `progress` is called with a description of the current stage and the
+        fraction of the load done, on the loading thread.
+        """
         self.path = path
+        self.streaming = streaming
         self.files = os.listdir(path)
         self.video_path = f"{path}/{Data.VIDEO_FILE_NAME}.mp4"
+        self._keyframes: np.ndarray | None = None
+        self._keyframes_loaded = False
+        self.rfids = get_rfids(path)
+        self._progress = progress
 
-        # Parse data
-        self.df = parse_tracking_data(
-            pd.read_csv(f"{path}/{Data.TRACKING_RESULTS_FILE_NAME}.csv")
+        cache = SessionCache(
+            path,
+            [
+                f"{path}/{Data.TRACKING_RESULTS_FILE_NAME}.csv",
+                f"{path}/rfid_reads.csv",
+                f"{path}/rfid_locations.csv",
+            ],
+            STREAM_CACHE_DIR_NAME if streaming else SESSION_DIR_NAME,
         )
-        self.rfids = get_rfids(path)
+
+        cached = False
+        if use_cache and cache.is_valid():
+            self._report("Loading cached session", 0.0)
+            try:
+                self._load_cache(cache)
+                cached = True
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Could not read session cache, parsing instead: {e}")
+
+        if not cached:
+            self._report("Parsing tracking data", 0.0)
+            self._parse(path)
+            if use_cache:
+                self._save_cache(cache)
+
+        # Edits are replayed on top of the (cached) base tracking data
+        self._report("Replaying edits", Data.LOAD_STAGES["parse"])
+        self.journal = EditJournal(
+            self.tracks, f"{path}/{Data.TRACKING_RESULTS_FILE_NAME}.csv"
+        )
+        self.journal.replay()
+
+        self._report("Indexing tracks", 1.0 - Data.LOAD_STAGES["index"])
+        self.missing_data = MissingDataIndex(self.tracks)
+        self.track_intervals = TrackIntervals(self.tracks)
+        self._report("Session loaded", 1.0)
+
+    @property
+    def keyframes(self) -> np.ndarray | None:
+        """Keyframe index of the video, read on first use."""
+        if not self._keyframes_loaded:
+            self._keyframes = load_keyframes(self.video_path)
+            self._keyframes_loaded = True
+        return self._keyframes
+
+    def _report(self, stage: str, fraction: float):
+        if self._progress is not None:
+            self._progress(stage, fraction)
+
+    def _parse(self, path):
+        tracking_path = f"{path}/{Data.TRACKING_RESULTS_FILE_NAME}.csv"
+        if self.streaming:
+            self.df, self._stream_arrays = index_tracking_data(
+                tracking_path,
+                lambda fraction: self._report(
+                    "Parsing tracking data", fraction * Data.LOAD_STAGES["parse"]
+                ),
+            )
+            self.tracks = streaming_track_store(tracking_path, self._stream_arrays)
+        else:
+            self.df, self.tracks = parse_tracking_data(
+                pd.read_csv(tracking_path, usecols=Data.TRACKING_COLS)
+            )
         self.rfid_reader_locations_df = pd.read_csv(f"{path}/rfid_locations.csv")
         self.rfid_reads_df = parse_rfid_readings(
             pd.read_csv(f"{path}/rfid_reads.csv"),
             self.df,
+            Data.MAX_READ_GAP,
+        )
+
+    def _load_cache(self, cache: SessionCache):
+        self.df = cache.load_frame("tracking")
+        if self.streaming:
+            self._stream_arrays = {
+                name: cache.load_array(name) for name in STREAM_ARRAYS
+            }
+            self.tracks = streaming_track_store(
+                f"{self.path}/{Data.TRACKING_RESULTS_FILE_NAME}.csv",
+                self._stream_arrays,
+            )
+        else:
+            self.tracks = TrackStore(
+                cache.load_array("frames"),
+                cache.load_array("boxes"),
+                cache.load_array("rfids"),
+                cache.load_array("offsets"),
+            )
+        self.rfid_reader_locations_df = cache.load_frame("rfid_locations")
+        self.rfid_reads_df = cache.load_frame("rfid_reads")
+
+    def _save_cache(self, cache: SessionCache):
+        if self.streaming:
+            arrays = self._stream_arrays
+        else:
+            arrays = {
+                "frames": self.tracks.frames,
+                "boxes": self.tracks.boxes,
+                "rfids": self.tracks.rfids,
+                "offsets": self.tracks.offsets,
+            }
+        cache.save(
+            arrays,
+            {
+                "tracking": self.df,
+                "rfid_locations": self.rfid_reader_locations_df,
+                "rfid_reads": self.rfid_reads_df,
+            },
         )
 
 
-def load_data(path):
-    return Data(path)
+def load_data(
+    path,
+    streaming: bool = False,
+    progress: Callable[[str, float], None] | None = None,
+):
+    return Data(path, streaming=streaming, progress=progress)
@@ -0,0 +1,51 @@
+import numpy as np
+
+from .tracks import TrackStore
+
+
+class MissingDataIndex:
+    """
+    Rows whose detections are not all labelled with an RFID.
+
+    A missing-data interval is a run of consecutive rows with unlabelled
+    detections and is reported by the frame of its first row. `update` only
+    re-evaluates the rows touched by an edit and returns what changed, so
+    callers can patch their views instead of rebuilding them.
+    """
+
+    def __init__(self, tracks: TrackStore):
+        self.tracks = tracks
+        self.mismatch = tracks.labelled_counts() != tracks.track_counts()
+        self.is_start = self._starts(0, len(self.mismatch))
+
+    def start_frames(self) -> np.ndarray:
+        return self.tracks.frames[self.is_start]
+
+    def update(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Re-evaluate the rows between the first and last of `frames`.
+
+        Returns the interval start frames removed and added.
+        """
+        rows = self.tracks.frame_index[np.asarray(frames, dtype=np.int64)]
+        rows = rows[rows >= 0]
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        lo, hi = int(rows.min()), int(rows.max()) + 1
+        labelled = self.tracks.labelled_counts(lo, hi)
+        self.mismatch[lo:hi] = labelled != self.tracks.track_counts(lo, hi)
+
+        # The row after the range starts an interval depending on the last one
+        hi = min(hi + 1, len(self.mismatch))
+        old = self.is_start[lo:hi].copy()
+        new = self._starts(lo, hi)
+        self.is_start[lo:hi] = new
+
+        frames = self.tracks.frames[lo:hi]
+        return frames[old & ~new], frames[new & ~old]
+
+    def _starts(self, lo: int, hi: int) -> np.ndarray:
+        before = self.mismatch[lo - 1] if lo > 0 else False
+        previous = np.concatenate([[before], self.mismatch[lo : hi - 1]])
+        return self.mismatch[lo:hi] & ~previous
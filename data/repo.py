@@ -1,74 +1,63 @@
-from typing import cast, List
+from collections.abc import Callable
 import os
+import numpy as np
 import pandas as pd
 
+from .events import EventTable
+from .intervals import TrackIntervals
 from .loader import Data
+from .missing import MissingDataIndex
+from .saver import BackgroundSaver
+from .tracks import NO_RFID, TrackStore
 
-"""
-Getters
-"""
-
-
-def get_frame_data(df: pd.DataFrame, frame: int) -> dict:
-    row = df[df["frame"] == frame].reset_index(drop=True)
-    sort_tracks = cast(List[List[int]], row["sort_tracks"])
-    rfid_tracks = cast(List[List[int]], row["RFID_tracks"])
 
-    try:
-        sort_tracks = row["sort_tracks"][0]
-        rfid_tracks = row["RFID_tracks"][0]
-    except Exception:
-        return {}
-
-    yolo_to_rfid = {}
-    for track in sort_tracks:
-        yolo_id = track[-1]
-
-        matched = False
-        for rfid_track in rfid_tracks:
-            if rfid_track[:4] == track[:4]:
-                yolo_to_rfid[yolo_id] = rfid_track[-1]
-                matched = True
+EXPORT_CHUNK_ROWS = 20_000
 
-        if not matched:
-            yolo_to_rfid[yolo_id] = None
+MISSING_DATA_LABEL = "Frame {frame}"
+RFID_READ_LABEL = "RFID Reader: {Reader} | RFID: {RFID} | Frame: {frame}"
 
-    return yolo_to_rfid
 
+"""
+Getters
+"""
 
-def get_missing_data(df: pd.DataFrame) -> List[dict]:
-    df["rfid_length"] = df["RFID_tracks"].apply(len)
-    df["sort_length"] = df["sort_tracks"].apply(len)
-
-    df["length_mismatch"] = df["rfid_length"] != df["sort_length"]
 
-    mismatches = df[
-        df["length_mismatch"] & ~df["length_mismatch"].shift(fill_value=False)
-    ]
+def get_frame_data(tracks: TrackStore, frame: int) -> dict:
+    boxes, rfids = tracks.frame_tracks(frame)
 
-    return [
-        {"label": f"Frame {frame}", "frame": frame} for frame in mismatches["frame"]
-    ]
+    return {
+        int(yolo_id): (int(rfid) if rfid != NO_RFID else None)
+        for yolo_id, rfid in zip(boxes[:, 4], rfids)
+    }
 
 
-def get_rfid_reads(rfid_reads_df: pd.DataFrame) -> List[dict]:
-    res = []
+def get_track_info(intervals: TrackIntervals, yolo_id: int, frame: int) -> dict:
+    """
+    Where `yolo_id` starts and ends, the RFID run holding `frame` and the next
+    RFID change after it; frames are None when there is none.
+    """
+    span = intervals.span(yolo_id)
+    run = intervals.run_at(yolo_id, frame)
+    return {
+        "first": span[0] if span else None,
+        "last": span[1] if span else None,
+        "run_start": run[0] if run else None,
+        "run_end": run[1] if run else None,
+        "next_change": intervals.next_rfid_change(yolo_id, frame),
+    }
 
-    for _, row in rfid_reads_df.iterrows():
-        reader = int(row["Reader"])
-        rfid = int(row["RFID"])
-        frame = int(row["frame"])
 
-        label = f"RFID Reader: {reader} | RFID: {rfid} | Frame: {frame}"
+def get_missing_data(missing_data: MissingDataIndex) -> EventTable:
+    return EventTable(MISSING_DATA_LABEL, missing_data.start_frames())
 
-        res.append(
-            {
-                "label": label,
-                "frame": frame,
-            }
-        )
 
-    return res
+def get_rfid_reads(rfid_reads_df: pd.DataFrame) -> EventTable:
+    return EventTable(
+        RFID_READ_LABEL,
+        rfid_reads_df["frame"].to_numpy(),
+        Reader=rfid_reads_df["Reader"].to_numpy(),
+        RFID=rfid_reads_df["RFID"].to_numpy(),
+    )
 
 
 """
@@ -77,45 +66,51 @@ Setters
 
 
 def update_rfid_map(
-    df: pd.DataFrame,
+    data: Data,
     yolo_id: int,
     update_rfid: int,
     from_: int | None = None,
     to_: int | None = None,
-) -> None:
-    if from_ is None:
-        from_ = int(df["frame"].min())
-    if to_ is None:
-        to_ = int(df["frame"].max())
-
-    contains_yolo_id = df["sort_tracks"].apply(
-        lambda tracks: any(track[-1] == yolo_id for track in tracks)
+) -> np.ndarray:
+    """Label `yolo_id` with `update_rfid`; returns the frames touched."""
+    frames = data.journal.apply(yolo_id, update_rfid, from_, to_)
+    data.track_intervals.update(yolo_id)
+    return frames
+
+
+def undo_rfid_update(data: Data) -> np.ndarray | None:
+    record = data.journal.undo_record()
+    frames = data.journal.undo()
+    if record is not None:
+        data.track_intervals.update(record["yolo_id"])
+    return frames
+
+
+def redo_rfid_update(data: Data) -> np.ndarray | None:
+    record = data.journal.redo_record()
+    frames = data.journal.redo()
+    if record is not None:
+        data.track_intervals.update(record["yolo_id"])
+    return frames
+
+
+def update_missing_data(
+    data: Data, frames: np.ndarray | None
+) -> tuple[EventTable, EventTable]:
+    """
+    Re-evaluate missing data over the frames touched by an edit.
+
+    Returns the "Missing Data" events removed and added.
+    """
+    if frames is None:
+        frames = np.empty(0, dtype=np.int64)
+
+    removed, added = data.missing_data.update(frames)
+    return (
+        EventTable(MISSING_DATA_LABEL, removed),
+        EventTable(MISSING_DATA_LABEL, added),
     )
 
-    mask = (df["frame"] >= from_) & (df["frame"] <= to_) & contains_yolo_id
-
-    for idx, row in df[mask].iterrows():
-        sort_tracks = cast(List[List[int]], row["sort_tracks"])
-        rfid_tracks = cast(List[List[int]], row["RFID_tracks"])
-
-        matching_track = next(
-            (track for track in sort_tracks if track[-1] == yolo_id), None
-        )
-
-        if matching_track:
-            coordinates = matching_track[:4]
-
-            matching_rfid_track = next(
-                (track for track in rfid_tracks if track[:4] == coordinates), None
-            )
-
-            if matching_rfid_track:
-                matching_rfid_track[-1] = update_rfid
-            else:
-                rfid_tracks.append(coordinates + [update_rfid])
-
-            df.at[idx, "RFID_tracks"] = rfid_tracks
-
 
 """
 Save Data
@@ -123,6 +118,17 @@ Save Data
 
 
 def save_rfid_data(data: Data):
+    """Append the edits made since the last save to the session's edit journal."""
+    data.journal.flush()
+
+
+def compact_rfid_data(data: Data):
+    """Fold the edit journal into a snapshot, dropping the undo history."""
+    data.journal.flush()
+    data.journal.compact()
+
+
+def next_export_path(data: Data) -> str:
     files = os.listdir(data.path)
 
     next_file = 0
@@ -134,7 +140,65 @@ def save_rfid_data(data: Data):
         ):
             next_file = max(next_file, int(file_name.split("_")[-1][:-4]) + 1)
 
-    data.df.to_csv(
-        f"{data.path}/{Data.TRACKING_RESULTS_FILE_NAME}_{next_file}.csv",
-        index=False,
+    return f"{data.path}/{Data.TRACKING_RESULTS_FILE_NAME}_{next_file}.csv"
+
+
+def export_rfid_data(
+    data: Data,
+    snapshot=None,
+    progress: Callable[[float], None] | None = None,
+) -> str:
+    """
+    Write the edited tracking results as a new, numbered full CSV.
+
+    `snapshot` is an `rfid_snapshot` of the store to write instead of its live
+    RFIDs.
+    The CSV is written in chunks to a temporary file that is renamed into place
+    once complete, so a partial export is never left behind.
+    """
+    path = next_export_path(data)
+    tmp_path = path + ".tmp"
+    n_rows = len(data.df)
+
+    try:
+        with open(tmp_path, "w", newline="") as f:
+            for start in range(0, max(n_rows, 1), EXPORT_CHUNK_ROWS):
+                stop = min(start + EXPORT_CHUNK_ROWS, n_rows)
+                sort_tracks, rfid_tracks = data.tracks.to_strings(start, stop, snapshot)
+
+                data.df.iloc[start:stop].assign(
+                    sort_tracks=sort_tracks, RFID_tracks=rfid_tracks
+                ).to_csv(f, index=False, header=start == 0)
+
+                if progress is not None:
+                    progress(stop / max(n_rows, 1))
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return path
+
+
+def save_rfid_data_in_background(data: Data, saver: BackgroundSaver) -> bool:
+    """Queue a journal flush on `saver`; returns False if there was nothing to save."""
+    records = data.journal.take_unflushed()
+    if not records:
+        return False
+
+    saver.submit(
+        "Save",
+        lambda _: data.journal.write_records(records),
+        on_error=lambda _: data.journal.restore_unflushed(records),
+    )
+    return True
+
+
+def export_rfid_data_in_background(data: Data, saver: BackgroundSaver) -> None:
+    """Queue an export of the RFIDs as they are now, while editing carries on."""
+    snapshot = data.tracks.rfid_snapshot()
+    saver.submit(
+        "Export", lambda progress: export_rfid_data(data, snapshot, progress)
     )
@@ -0,0 +1,76 @@
+import queue
+
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BackgroundSaver:
+    """
+    Runs save jobs one at a time on a worker thread.
+
+    A job is called with a `progress(fraction)` callback. Progress, completion
+    and errors are queued and dispatched by `poll`, which the UI calls from its
+    own thread, so the handlers may touch widgets.
+    """
+
+    def __init__(
+        self,
+        on_progress: Callable[[str, float], None] | None = None,
+        on_done: Callable[[str], None] | None = None,
+        on_error: Callable[[str, Exception], None] | None = None,
+    ):
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self.events: queue.Queue[tuple] = queue.Queue()
+        self.pending = 0
+
+    def submit(
+        self,
+        name: str,
+        job: Callable[[Callable[[float], None]], None],
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> Future:
+        """Queue `job`; `on_error` runs on the UI thread if it raises."""
+        self.pending += 1
+        return self.executor.submit(self._run, name, job, on_error)
+
+    def is_busy(self) -> bool:
+        return self.pending > 0
+
+    def poll(self) -> None:
+        while not self.events.empty():
+            kind, name, payload, job_on_error = self.events.get_nowait()
+
+            if kind == "progress":
+                if self.on_progress is not None:
+                    self.on_progress(name, payload)
+                continue
+
+            self.pending -= 1
+            if kind == "done":
+                if self.on_done is not None:
+                    self.on_done(name)
+            else:
+                if job_on_error is not None:
+                    job_on_error(payload)
+                if self.on_error is not None:
+                    self.on_error(name, payload)
+
+    def shutdown(self) -> None:
+        """Wait for the queued jobs to finish."""
+        self.executor.shutdown(wait=True)
+        self.poll()
+
+    def _run(self, name, job, on_error) -> None:
+        def progress(fraction: float) -> None:
+            self.events.put(("progress", name, fraction, None))
+
+        try:
+            job(progress)
+        except Exception as e:
+            self.events.put(("error", name, e, on_error))
+        else:
+            self.events.put(("done", name, None, None))
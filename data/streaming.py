@@ -0,0 +1,447 @@
+import threading
+import numpy as np
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from .tracks import (
+    TrackStore,
+    build_frame_index,
+    count_labelled,
+    merge_segments,
+    replace_segments,
+)
+
+
+# Rows per chunk of the tracking file, and how many chunks stay in memory
+CHUNK_ROWS = 20_000
+MAX_RESIDENT_CHUNKS = 12
+
+# Chunks on either side of the play head that are loaded ahead of time
+PREFETCH_CHUNKS = 1
+
+READ_BLOCK_BYTES = 16 << 20
+
+
+def index_rows(path: str, chunk_rows: int = CHUNK_ROWS) -> np.ndarray:
+    """
+    Byte offsets of the start of every `chunk_rows`-th row of a CSV file.
+
+    The header is skipped; the last offset is the end of the file, so chunk `k`
+    is the bytes `offsets[k]:offsets[k + 1]`. Rows must not contain newlines.
+    """
+    with open(path, "rb") as f:
+        pos = len(f.readline())
+        offsets = [pos]
+        rows = 0
+
+        while block := f.read(READ_BLOCK_BYTES):
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+            ends = newlines[chunk_rows - rows - 1 :: chunk_rows]
+            offsets.extend((pos + ends + 1).tolist())
+            rows = (rows + len(newlines)) % chunk_rows
+            pos += len(block)
+
+    if offsets[-1] != pos:
+        offsets.append(pos)
+    return np.array(offsets, dtype=np.int64)
+
+
+class _Chunk:
+    """A resident chunk and how to undo the edits applied to it."""
+
+    def __init__(self, store: TrackStore):
+        self.store = store
+        # token -> (detections, previous rfids), in the order they were applied
+        self.undo: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+
+class StreamingTrackStore:
+    """
+    TrackStore over a tracking file too large to hold in memory.
+
+    Only the per-row frame numbers and detection counts are kept for the whole
+    session; the boxes and RFIDs are parsed a chunk of rows at a time by
+    `read_chunk` when a frame of the chunk is first asked for. The chunks around
+    the play head are prefetched on a worker thread and the least recently used
+    ones are evicted beyond `max_resident`.
+
+    Edits are kept as (yolo_id, rfid, from, to) records, applied to the resident
+    chunks they touch and replayed onto every chunk as it is loaded, so chunks
+    can be evicted without losing them. The methods the journal, the missing
+    data index and the exporter use mirror TrackStore; `set_rfid` returns an
+    edit token in place of the detections.
+    """
+
+    def __init__(
+        self,
+        read_chunk: Callable[[int], TrackStore],
+        row_starts: np.ndarray,
+        frames: np.ndarray,
+        track_counts: np.ndarray,
+        labelled_counts: np.ndarray,
+        yolo_ids: np.ndarray,
+        yolo_rows: np.ndarray,
+        segments: tuple[np.ndarray, ...],
+        max_resident: int = MAX_RESIDENT_CHUNKS,
+        prefetch: int = PREFETCH_CHUNKS,
+    ):
+        self.read_chunk = read_chunk
+        self.row_starts = row_starts
+        self.frames = frames
+        self.frame_index = build_frame_index(frames)
+        self.max_resident = max_resident
+        self.prefetch = prefetch
+
+        self._track_counts = track_counts
+        self._labelled_counts = np.array(labelled_counts)
+        self._det_starts = np.concatenate([[0], np.cumsum(track_counts)])[row_starts]
+        self._frames_sorted = bool(np.all(np.diff(frames) >= 0))
+
+        # First and last row of every YOLO ID, to find the chunks an edit touches
+        self._yolo_ids = yolo_ids
+        self._yolo_rows = yolo_rows
+
+        # Same-RFID segments of every track in the tracking file, before edits
+        self._segments = segments
+
+        # Snapshot of the RFID column the chunks start from, see `set_base_rfids`
+        self._base: np.ndarray | None = None
+
+        # (token, record) of the edits in effect, oldest first
+        self._edits: list[tuple[int, tuple]] = []
+        self._records: dict[int, tuple] = {}
+        self._edit_frames: dict[int, np.ndarray] = {}
+        self._next_token = 0
+
+        self._resident: OrderedDict[int, _Chunk] = OrderedDict()
+        self._loading: dict[int, Future] = {}
+        self._head = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        # Last chunk read for `to_strings` from a snapshot
+        self._snapshot_chunk: tuple[int, object, TrackStore] | None = None
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.row_starts) - 1
+
+    @property
+    def n_detections(self) -> int:
+        return int(self._det_starts[-1])
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (
+            self.frames,
+            self.frame_index,
+            self._track_counts,
+            self._labelled_counts,
+            self._yolo_ids,
+            self._yolo_rows,
+        )
+        with self._lock:
+            resident = [chunk.store for chunk in self._resident.values()]
+        return sum(a.nbytes for a in arrays) + sum(s.nbytes for s in resident)
+
+    def resident_chunks(self) -> list[int]:
+        with self._lock:
+            return sorted(self._resident)
+
+    def get_row_position(self, frame: int) -> int:
+        if 0 <= frame < len(self.frame_index):
+            return int(self.frame_index[frame])
+        return -1
+
+    def frame_tracks(self, frame: int) -> tuple[np.ndarray, np.ndarray]:
+        """Boxes and RFIDs of a frame, loading its chunk if it is not resident."""
+        pos = self.get_row_position(frame)
+        if pos < 0:
+            return np.empty((0, 5), dtype=np.int32), np.empty(0, dtype=np.int64)
+
+        k = self._chunk_of(pos)
+        self._head = k
+        store = self._chunk(k).store
+        self._prefetch(k)
+
+        local = pos - int(self.row_starts[k])
+        start, end = store.offsets[local], store.offsets[local + 1]
+        return store.boxes[start:end], store.rfids[start:end]
+
+    def track_counts(self, lo: int = 0, hi: int | None = None) -> np.ndarray:
+        return self._track_counts[lo:hi]
+
+    def labelled_counts(self, lo: int = 0, hi: int | None = None) -> np.ndarray:
+        return self._labelled_counts[lo:hi]
+
+    def detection_frames(self, token: int) -> np.ndarray:
+        return self._edit_frames[token]
+
+    def set_rfid(
+        self,
+        yolo_id: int,
+        rfid: int,
+        from_: int | None = None,
+        to_: int | None = None,
+    ) -> tuple[int, None]:
+        """
+        Label `yolo_id` with `rfid` between two frames.
+
+        Loads the chunks the edit touches. Returns an edit token in place of the
+        detections touched, for `detection_frames` and `restore_rfids`.
+        """
+        token = self._next_token
+        self._next_token += 1
+        record = (yolo_id, rfid, from_, to_)
+
+        self._records[token] = record
+        with self._lock:
+            self._edits.append((token, record))
+
+        frames = []
+        for k in self._edit_chunks(yolo_id, from_, to_):
+            chunk = self._chunk(k)
+            with self._lock:
+                if token not in chunk.undo:
+                    self._apply(chunk, token, record)
+                    self._update_labelled(k, chunk)
+                detections = chunk.undo[token][0]
+            frames.append(chunk.store.detection_frames(detections))
+
+        self._edit_frames[token] = (
+            np.concatenate(frames) if frames else np.empty(0, dtype=np.int64)
+        )
+        return token, None
+
+    def restore_rfids(self, token: int, _=None) -> None:
+        """Undo the edit `token`, loading the chunks it touched."""
+        with self._lock:
+            self._edits = [(t, r) for t, r in self._edits if t != token]
+
+        yolo_id, _, from_, to_ = self._records[token]
+        for k in self._edit_chunks(yolo_id, from_, to_):
+            chunk = self._chunk(k)
+            with self._lock:
+                if token in chunk.undo:
+                    self._restore(chunk, token)
+                    self._update_labelled(k, chunk)
+
+    def track_segments(self) -> tuple[np.ndarray, ...]:
+        """Same-RFID segments of every YOLO track, see `merge_segments`."""
+        snapshot = self.rfid_snapshot()
+        base, _ = snapshot
+        if base is not None:
+            # A compacted snapshot may relabel any track, so every chunk is read
+            parts = [
+                self._snapshot_store(k, snapshot).track_segments()
+                for k in range(self.n_chunks)
+            ]
+            return merge_segments(*(np.concatenate(c) for c in zip(*parts)))
+
+        segments = self._segments
+        with self._lock:
+            edited = {record[0] for _, record in self._edits}
+        for yolo_id in sorted(edited):
+            segments = replace_segments(
+                segments, yolo_id, self.yolo_segments(yolo_id)
+            )
+        return segments
+
+    def yolo_segments(self, yolo_id: int) -> tuple[np.ndarray, ...]:
+        """Same-RFID segments of one YOLO track, loading the chunks it spans."""
+        parts = [
+            self._chunk(k).store.yolo_segments(yolo_id)
+            for k in self._edit_chunks(yolo_id, None, None)
+        ]
+        if not parts:
+            return tuple(np.empty(0, dtype=np.int64) for _ in range(4))
+        return merge_segments(*(np.concatenate(c) for c in zip(*parts)))
+
+    def set_base_rfids(self, rfids: np.ndarray) -> None:
+        """Start every chunk from a snapshot of the RFID column, e.g. memory-mapped."""
+        with self._lock:
+            self._base = rfids
+            self._resident.clear()
+            self._snapshot_chunk = None
+
+            for k in range(self.n_chunks):
+                lo, hi = self.row_starts[k], self.row_starts[k + 1]
+                det_lo, det_hi = self._det_starts[k], self._det_starts[k + 1]
+                offsets = np.concatenate([[0], np.cumsum(self._track_counts[lo:hi])])
+                self._labelled_counts[lo:hi] = count_labelled(
+                    rfids[det_lo:det_hi], offsets
+                )
+
+    def rfid_snapshot(self) -> tuple[np.ndarray | None, list[tuple]]:
+        """The edits in effect, which `to_strings` can write later."""
+        with self._lock:
+            return self._base, [record for _, record in self._edits]
+
+    def rfid_chunks(self):
+        """Yield the RFID column a chunk at a time, in detection order."""
+        snapshot = self.rfid_snapshot()
+        for k in range(self.n_chunks):
+            yield self._snapshot_store(k, snapshot).rfids
+
+    def to_strings(
+        self,
+        start: int = 0,
+        stop: int | None = None,
+        snapshot: tuple | None = None,
+    ) -> tuple[list[str], list[str]]:
+        """
+        Serialise rows `start:stop` like `TrackStore.to_strings`.
+
+        Given an `rfid_snapshot`, chunks are read separately from the resident
+        ones, so this may run on a worker thread while editing carries on.
+        """
+        stop = len(self) if stop is None else stop
+        sort_tracks: list[str] = []
+        rfid_tracks: list[str] = []
+
+        while start < stop:
+            k = self._chunk_of(start)
+            chunk_start = int(self.row_starts[k])
+            chunk_stop = min(stop, int(self.row_starts[k + 1]))
+
+            if snapshot is None:
+                store = self._chunk(k).store
+            else:
+                store = self._snapshot_store(k, snapshot)
+
+            sort, rfid = store.to_strings(start - chunk_start, chunk_stop - chunk_start)
+            sort_tracks += sort
+            rfid_tracks += rfid
+            start = chunk_stop
+
+        return sort_tracks, rfid_tracks
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _chunk_of(self, row: int) -> int:
+        return int(np.searchsorted(self.row_starts, row, side="right")) - 1
+
+    def _edit_chunks(
+        self, yolo_id: int, from_: int | None, to_: int | None
+    ) -> range:
+        i = np.searchsorted(self._yolo_ids, yolo_id)
+        if i == len(self._yolo_ids) or self._yolo_ids[i] != yolo_id:
+            return range(0)
+
+        lo, hi = (int(r) for r in self._yolo_rows[i])
+        if self._frames_sorted:
+            if from_ is not None:
+                lo = max(lo, int(np.searchsorted(self.frames, from_, side="left")))
+            if to_ is not None:
+                hi = min(hi, int(np.searchsorted(self.frames, to_, side="right")) - 1)
+        if lo > hi:
+            return range(0)
+        return range(self._chunk_of(lo), self._chunk_of(hi) + 1)
+
+    def _chunk(self, k: int) -> _Chunk:
+        """Chunk `k`, loading it on the calling thread unless it already is."""
+        with self._lock:
+            chunk = self._resident.get(k)
+            if chunk is not None:
+                self._resident.move_to_end(k)
+                return chunk
+
+            future = self._loading.get(k)
+            if future is None:
+                future = self._loading[k] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            return future.result()
+
+        try:
+            chunk = self._load(k)
+            future.set_result(chunk)
+            return chunk
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(k, None)
+
+    def _load(self, k: int) -> _Chunk:
+        store = self.read_chunk(k)
+        with self._lock:
+            base = self._base
+            edits = list(self._edits)
+        if base is not None:
+            store.set_base_rfids(base[self._det_starts[k] : self._det_starts[k + 1]])
+
+        chunk = _Chunk(store)
+        for token, record in edits:
+            self._apply(chunk, token, record)
+
+        with self._lock:
+            # Catch up with the edits made or undone while the chunk was parsed
+            tokens = {token for token, _ in self._edits}
+            for token in reversed(list(chunk.undo)):
+                if token not in tokens:
+                    self._restore(chunk, token)
+            for token, record in self._edits:
+                if token not in chunk.undo:
+                    self._apply(chunk, token, record)
+
+            self._update_labelled(k, chunk)
+            self._resident[k] = chunk
+            self._evict()
+        return chunk
+
+    def _evict(self) -> None:
+        protected = range(self._head - self.prefetch, self._head + self.prefetch + 1)
+        for k in list(self._resident):
+            if len(self._resident) <= self.max_resident:
+                break
+            if k not in protected:
+                del self._resident[k]
+
+    def _prefetch(self, k: int) -> None:
+        for neighbour in range(k - self.prefetch, k + self.prefetch + 1):
+            if not 0 <= neighbour < self.n_chunks:
+                continue
+            with self._lock:
+                if neighbour in self._resident or neighbour in self._loading:
+                    continue
+            try:
+                self._executor.submit(self._chunk, neighbour)
+            except RuntimeError:
+                return
+
+    def _apply(self, chunk: _Chunk, token: int, record: tuple) -> None:
+        chunk.undo[token] = chunk.store.set_rfid(*record)
+
+    def _restore(self, chunk: _Chunk, token: int) -> None:
+        chunk.store.restore_rfids(*chunk.undo.pop(token))
+
+    def _update_labelled(self, k: int, chunk: _Chunk) -> None:
+        lo, hi = self.row_starts[k], self.row_starts[k + 1]
+        self._labelled_counts[lo:hi] = chunk.store.labelled_counts()
+
+    def _snapshot_store(self, k: int, snapshot: tuple) -> TrackStore:
+        """Chunk `k` as of `snapshot`, read without touching the resident ones."""
+        cached = self._snapshot_chunk
+        if cached is not None and cached[0] == k and cached[1] is snapshot:
+            return cached[2]
+
+        base, records = snapshot
+        store = self.read_chunk(k)
+        if base is not None:
+            store.set_base_rfids(base[self._det_starts[k] : self._det_starts[k + 1]])
+        for record in records:
+            store.set_rfid(*record)
+
+        self._snapshot_chunk = (k, snapshot, store)
+        return store
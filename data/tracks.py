@@ -0,0 +1,385 @@
+import numpy as np
+import pandas as pd
+
+from typing import Iterable
+
+
+NO_RFID = -1
+
+_DIGITS = np.zeros(256, dtype=bool)
+_DIGITS[ord("0") : ord("9") + 1] = True
+_DIGITS[ord("-")] = True
+
+
+def build_frame_index(frames: np.ndarray) -> np.ndarray:
+    """Map every frame number to its row position, or -1 if it has no row."""
+    frames = np.asarray(frames, dtype=np.int64)
+    if len(frames) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    index = np.full(int(frames.max()) + 1, -1, dtype=np.int64)
+    valid = np.flatnonzero(frames >= 0)
+
+    # Assign in reverse so the first row of a duplicated frame wins
+    index[frames[valid[::-1]]] = valid[::-1]
+    return index
+
+
+def parse_track_column(strings: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse a column of "[[x1, y1, x2, y2, id], ...]" strings without literal_eval.
+
+    Returns the flat (N, 5) int64 values and the (rows + 1,) offsets into them.
+    """
+    buf = np.frombuffer("\n".join(strings).encode() + b"\n", dtype=np.uint8)
+
+    # Every row has one outer bracket plus one bracket per track
+    row_ends = np.flatnonzero(buf == ord("\n"))
+    opens = np.flatnonzero(buf == ord("["))
+    counts = np.bincount(
+        np.searchsorted(row_ends, opens), minlength=len(row_ends)
+    ) - 1
+
+    if np.any(counts < 0):
+        raise ValueError("Malformed track data: row without a track list")
+
+    offsets = np.zeros(len(row_ends) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    numbers = np.where(_DIGITS[buf], buf, ord(" ")).astype(np.uint8).tobytes()
+    values = np.fromstring(numbers, dtype=np.int64, sep=" ")
+
+    if len(values) != offsets[-1] * 5:
+        raise ValueError("Malformed track data: expected 5 integers per track")
+
+    return values.reshape(-1, 5), offsets
+
+
+def row_numbers(offsets: np.ndarray) -> np.ndarray:
+    """Row position of every flat entry described by `offsets`."""
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def count_labelled(rfids: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Number of `rfids` other than NO_RFID in every range described by `offsets`."""
+    labelled = np.concatenate([[0], np.cumsum(rfids != NO_RFID)])
+    return labelled[offsets[1:]] - labelled[offsets[:-1]]
+
+
+def merge_segments(
+    yolo_ids: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    rfids: np.ndarray,
+    assume_sorted: bool = False,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge frame ranges of YOLO tracks into maximal same-RFID segments.
+
+    Ranges of a track that touch or overlap and carry the same RFID are joined;
+    a single detection is the range (frame, frame). Returns the segments'
+    YOLO IDs, first and last frames and RFIDs, sorted by YOLO ID then frame.
+    """
+    if not assume_sorted:
+        order = np.lexsort((starts, yolo_ids))
+        yolo_ids, starts, ends, rfids = (
+            yolo_ids[order],
+            starts[order],
+            ends[order],
+            rfids[order],
+        )
+    if len(yolo_ids) == 0:
+        return yolo_ids, starts, ends, rfids
+
+    new = np.ones(len(yolo_ids), dtype=bool)
+    new[1:] = (
+        (yolo_ids[1:] != yolo_ids[:-1])
+        | (rfids[1:] != rfids[:-1])
+        | (starts[1:] > ends[:-1] + 1)
+    )
+    first = np.flatnonzero(new)
+    return (
+        yolo_ids[first],
+        starts[first],
+        np.maximum.reduceat(ends, first),
+        rfids[first],
+    )
+
+
+def replace_segments(
+    segments: tuple[np.ndarray, ...],
+    yolo_id: int,
+    new: tuple[np.ndarray, ...],
+) -> tuple[np.ndarray, ...]:
+    """Swap the segments of `yolo_id` for `new`, keeping the order."""
+    yolo_ids = segments[0]
+    lo = np.searchsorted(yolo_ids, yolo_id, side="left")
+    hi = np.searchsorted(yolo_ids, yolo_id, side="right")
+    return tuple(
+        np.concatenate([column[:lo], new_column, column[hi:]])
+        for column, new_column in zip(segments, new)
+    )
+
+
+def format_tracks(boxes: np.ndarray, rfids: np.ndarray | None = None) -> str:
+    if rfids is None:
+        return str(boxes.tolist())
+
+    return str(np.column_stack([boxes[:, :4], rfids]).tolist())
+
+
+class YoloIndex:
+    """
+    Detections grouped by YOLO ID, sorted by frame within each ID.
+
+    YOLO IDs and frames never change after loading, so the index stays valid as
+    RFIDs are edited; it only ever points into the store's arrays.
+    """
+
+    def __init__(self, tracks: "TrackStore"):
+        yolo_ids = tracks.boxes[:, 4]
+        frames = tracks.frames[row_numbers(tracks.offsets)]
+
+        self.order = np.lexsort((frames, yolo_ids))
+        self.frames = frames[self.order]
+
+        sorted_ids = yolo_ids[self.order]
+        self.ids, self.starts = np.unique(sorted_ids, return_index=True)
+        self.ends = np.append(self.starts[1:], len(sorted_ids))
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.order, self.frames, self.ids, self.starts, self.ends)
+        return sum(a.nbytes for a in arrays)
+
+    def span(self, yolo_id: int) -> tuple[int, int]:
+        """Range of `order` holding the detections of `yolo_id`."""
+        i = np.searchsorted(self.ids, yolo_id)
+        if i == len(self.ids) or self.ids[i] != yolo_id:
+            return 0, 0
+        return int(self.starts[i]), int(self.ends[i])
+
+    def select(
+        self, yolo_id: int, from_: int | None = None, to_: int | None = None
+    ) -> tuple[int, int]:
+        """Range of `order` holding the detections of `yolo_id` between two frames."""
+        start, end = self.span(yolo_id)
+        frames = self.frames[start:end]
+
+        lo = np.searchsorted(frames, from_, side="left") if from_ is not None else 0
+        hi = np.searchsorted(frames, to_, side="right") if to_ is not None else None
+        hi = len(frames) if hi is None else max(int(hi), int(lo))
+
+        return start + int(lo), start + hi
+
+    def detections(
+        self, yolo_id: int, from_: int | None = None, to_: int | None = None
+    ) -> np.ndarray:
+        """Positions in the store of the detections of `yolo_id` between two frames."""
+        start, end = self.select(yolo_id, from_, to_)
+        return self.order[start:end]
+
+
+class TrackStore:
+    """
+    Columnar store of the SORT detections of a session.
+
+    Row `r` of the tracking table owns `boxes[offsets[r]:offsets[r + 1]]`, each
+    box being (x1, y1, x2, y2, yolo_id). `rfids` holds the RFID assigned to every
+    detection, or NO_RFID when it is unlabelled.
+    """
+
+    def __init__(
+        self,
+        frames: np.ndarray,
+        boxes: np.ndarray,
+        rfids: np.ndarray,
+        offsets: np.ndarray,
+    ):
+        self.frames = frames
+        self.boxes = boxes
+        self.rfids = rfids
+        self.offsets = offsets
+        self._frame_index: np.ndarray | None = None
+        self._yolo_index: YoloIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.frames, self.boxes, self.rfids, self.offsets]
+        if self._frame_index is not None:
+            arrays.append(self._frame_index)
+        nbytes = sum(a.nbytes for a in arrays)
+        if self._yolo_index is not None:
+            nbytes += self._yolo_index.nbytes
+        return nbytes
+
+    @property
+    def frame_index(self) -> np.ndarray:
+        if self._frame_index is None:
+            self._frame_index = build_frame_index(self.frames)
+        return self._frame_index
+
+    @property
+    def yolo_index(self) -> YoloIndex:
+        if self._yolo_index is None:
+            self._yolo_index = YoloIndex(self)
+        return self._yolo_index
+
+    def get_row_position(self, frame: int) -> int:
+        if 0 <= frame < len(self.frame_index):
+            return int(self.frame_index[frame])
+        return -1
+
+    def frame_tracks(self, frame: int) -> tuple[np.ndarray, np.ndarray]:
+        """Boxes and RFIDs of a frame, as views into the store."""
+        pos = self.get_row_position(frame)
+        if pos < 0:
+            return self.boxes[:0], self.rfids[:0]
+
+        start, end = self.offsets[pos], self.offsets[pos + 1]
+        return self.boxes[start:end], self.rfids[start:end]
+
+    @property
+    def n_detections(self) -> int:
+        return len(self.boxes)
+
+    def track_counts(self, lo: int = 0, hi: int | None = None) -> np.ndarray:
+        """Number of detections of rows `lo:hi`."""
+        return np.diff(self.offsets[lo : (len(self) if hi is None else hi) + 1])
+
+    def labelled_counts(self, lo: int = 0, hi: int | None = None) -> np.ndarray:
+        """Number of detections carrying an RFID of rows `lo:hi`."""
+        offsets = self.offsets[lo : (len(self) if hi is None else hi) + 1]
+        rfids = self.rfids[offsets[0] : offsets[-1]]
+        return count_labelled(rfids, offsets - offsets[0])
+
+    def detection_frames(self, detections: np.ndarray) -> np.ndarray:
+        rows = np.searchsorted(self.offsets, detections, side="right") - 1
+        return self.frames[rows]
+
+    def set_rfid(
+        self,
+        yolo_id: int,
+        rfid: int,
+        from_: int | None = None,
+        to_: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Label `yolo_id` with `rfid` between two frames.
+
+        Returns the detections touched and the RFIDs they had before.
+        """
+        start, end = self.yolo_index.select(yolo_id, from_, to_)
+        detections = self.yolo_index.order[start:end]
+        previous = self.rfids[detections]
+
+        self.rfids[detections] = rfid
+        return detections, previous
+
+    def restore_rfids(self, detections: np.ndarray, rfids: np.ndarray) -> None:
+        self.rfids[detections] = rfids
+
+    def track_segments(self) -> tuple[np.ndarray, ...]:
+        """Same-RFID segments of every YOLO track, see `merge_segments`."""
+        index = self.yolo_index
+        frames = index.frames
+        return merge_segments(
+            self.boxes[index.order, 4].astype(np.int64),
+            frames,
+            frames,
+            self.rfids[index.order],
+            assume_sorted=True,
+        )
+
+    def yolo_segments(self, yolo_id: int) -> tuple[np.ndarray, ...]:
+        """Same-RFID segments of one YOLO track."""
+        start, end = self.yolo_index.span(yolo_id)
+        frames = self.yolo_index.frames[start:end]
+        return merge_segments(
+            np.full(len(frames), yolo_id, dtype=np.int64),
+            frames,
+            frames,
+            self.rfids[self.yolo_index.order[start:end]],
+            assume_sorted=True,
+        )
+
+    def set_base_rfids(self, rfids: np.ndarray) -> None:
+        """Replace the whole RFID column, e.g. with a compacted edit snapshot."""
+        self.rfids[:] = rfids
+
+    def rfid_snapshot(self) -> np.ndarray:
+        """A copy of the RFID column that `to_strings` can write later."""
+        return self.rfids.copy()
+
+    def rfid_chunks(self):
+        """Yield the RFID column in pieces, in detection order."""
+        yield self.rfids
+
+    def to_strings(
+        self,
+        start: int = 0,
+        stop: int | None = None,
+        snapshot: np.ndarray | None = None,
+    ) -> tuple[list[str], list[str]]:
+        """
+        Serialise rows `start:stop` back to the `sort_tracks` / `RFID_tracks`
+        string columns, optionally from an `rfid_snapshot`.
+        """
+        all_rfids = self.rfids if snapshot is None else snapshot
+        stop = len(self.offsets) - 1 if stop is None else stop
+        offsets = self.offsets[start : stop + 1]
+        sort_tracks = []
+        rfid_tracks = []
+
+        for row_start, row_end in zip(offsets[:-1], offsets[1:]):
+            boxes = self.boxes[row_start:row_end]
+            rfids = all_rfids[row_start:row_end]
+            labelled = rfids != NO_RFID
+
+            sort_tracks.append(format_tracks(boxes))
+            rfid_tracks.append(format_tracks(boxes[labelled], rfids[labelled]))
+
+        return sort_tracks, rfid_tracks
+
+
+def build_track_store(
+    frames: np.ndarray, sort_tracks: Iterable[str], rfid_tracks: Iterable[str]
+) -> TrackStore:
+    """
+    Build a TrackStore from the raw `sort_tracks` and `RFID_tracks` columns.
+
+    An RFID track is attached to the SORT detection of the same row with the same
+    coordinates; RFID tracks without a matching detection are dropped.
+    """
+    values, offsets = parse_track_column(sort_tracks)
+    rfid_values, rfid_offsets = parse_track_column(rfid_tracks)
+
+    if len(offsets) != len(rfid_offsets):
+        raise ValueError("sort_tracks and RFID_tracks have different row counts")
+
+    boxes = values.astype(np.int32)
+    rfids = np.full(len(boxes), NO_RFID, dtype=np.int64)
+
+    # Match on (row, x1, y1, x2, y2); the last RFID track for a box wins
+    key_cols = ["row", "x1", "y1", "x2", "y2"]
+    detections = pd.DataFrame(values[:, :4], columns=key_cols[1:])
+    detections.insert(0, "row", row_numbers(offsets))
+    detections["detection"] = np.arange(len(values))
+
+    labels = pd.DataFrame(rfid_values[:, :4], columns=key_cols[1:])
+    labels.insert(0, "row", row_numbers(rfid_offsets))
+    labels["rfid"] = rfid_values[:, 4]
+    labels = labels.drop_duplicates(subset=key_cols, keep="last")
+
+    matched = detections.merge(labels, on=key_cols, how="inner")
+    rfids[matched["detection"].to_numpy()] = matched["rfid"].to_numpy()
+
+    return TrackStore(
+        np.asarray(frames, dtype=np.int64),
+        boxes,
+        rfids,
+        offsets,
+    )
@@ -0,0 +1,236 @@
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import cv2
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from data import loader, drawer
+from ui.frame_reader import FrameReader
+
+
+FOURCC = "mp4v"
+
+# Chunks per worker, so a slow chunk doesn't leave the other workers idle
+CHUNKS_PER_WORKER = 4
+
+# Session data of a worker process, loaded once by `_init_worker`
+_worker = {}
+
+
+def split_range(
+    start: int, stop: int, n_chunks: int, keyframes: np.ndarray | None = None
+) -> list[tuple[int, int]]:
+    """Split `start:stop` into chunks, starting each on a keyframe when known."""
+    bounds = np.linspace(start, stop, n_chunks + 1).round().astype(np.int64)
+
+    if keyframes is not None and len(keyframes):
+        idx = np.searchsorted(keyframes, bounds[1:-1]).clip(0, len(keyframes) - 1)
+        bounds[1:-1] = keyframes[idx].clip(start, stop)
+
+    bounds = np.unique(bounds)
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def _init_worker(session_path: str, show_readers: bool) -> None:
+    cv2.setNumThreads(1)
+    data = loader.Data(session_path)
+
+    _worker["data"] = data
+    _worker["readers"] = (
+        drawer.ReaderLayer(data.rfid_reader_locations_df) if show_readers else None
+    )
+
+
+def render_chunk(start: int, stop: int, out_path: str) -> int:
+    """Render frames `start:stop` of the worker's session; returns the count."""
+    data = _worker["data"]
+    readers = _worker["readers"]
+
+    reader = FrameReader(data.video_path, keyframes=data.keyframes)
+    writer = None
+    written = 0
+
+    try:
+        for frame_number in range(start, stop):
+            frame = reader.read(frame_number)
+            if frame is None:
+                break
+
+            if readers is not None:
+                frame = readers.draw(frame)
+            frame = drawer.draw_bboxes(data.tracks, frame, frame_number)
+
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = cv2.VideoWriter(
+                    out_path,
+                    cv2.VideoWriter_fourcc(*FOURCC),
+                    reader.fps,
+                    (width, height),
+                )
+            writer.write(frame)
+            written += 1
+    finally:
+        reader.close()
+        if writer is not None:
+            writer.release()
+
+    return written
+
+
+def stitch(parts: list[str], out_path: str, fps: float) -> None:
+    """Concatenate the chunk videos, without re-encoding when ffmpeg is available."""
+    ffmpeg = shutil.which("ffmpeg")
+
+    if ffmpeg is not None:
+        list_path = out_path + ".parts.txt"
+        with open(list_path, "w") as f:
+            f.writelines(f"file '{os.path.abspath(part)}'\n" for part in parts)
+        try:
+            subprocess.run(
+                [ffmpeg, "-loglevel", "error", "-y", "-f", "concat", "-safe", "0"]
+                + ["-i", list_path, "-c", "copy", out_path],
+                check=True,
+            )
+        finally:
+            os.remove(list_path)
+        return
+
+    print("ffmpeg not found, re-encoding the chunks to stitch them")
+    writer = None
+    for part in parts:
+        cap = cv2.VideoCapture(part)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = cv2.VideoWriter(
+                    out_path, cv2.VideoWriter_fourcc(*FOURCC), fps, (width, height)
+                )
+            writer.write(frame)
+        cap.release()
+
+    if writer is not None:
+        writer.release()
+
+
+def export_video(
+    session_path: str,
+    out_path: str,
+    from_: int = 0,
+    to_: int | None = None,
+    workers: int | None = None,
+    show_readers: bool = False,
+) -> dict:
+    """
+    Render the annotated video of a session, or of frames `from_:to_`.
+
+    `to_` is exclusive. Frame-range chunks are rendered by a pool of worker
+    processes, each loading the session itself, and stitched together at the end.
+    Raises ValueError if the range holds no frames of the video.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    cap = cv2.VideoCapture(f"{session_path}/{loader.Data.VIDEO_FILE_NAME}.mp4")
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or FrameReader.DEFAULT_FPS
+    cap.release()
+
+    to_ = frame_count if to_ is None else min(to_, frame_count)
+    if not 0 <= from_ < to_:
+        raise ValueError(
+            f"no frames to export in {from_}:{to_} (the video has {frame_count})"
+        )
+
+    # Loading once up front builds the session cache the workers then map in
+    data = loader.Data(session_path)
+    chunks = split_range(from_, to_, workers * CHUNKS_PER_WORKER, data.keyframes)
+
+    start = time.perf_counter()
+    parts_dir = tempfile.mkdtemp(prefix="parts_", dir=os.path.dirname(out_path) or ".")
+    try:
+        parts = [
+            os.path.join(parts_dir, f"chunk_{i:05d}.mp4") for i in range(len(chunks))
+        ]
+        rendered = 0
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(session_path, show_readers),
+        ) as pool:
+            futures = [
+                pool.submit(render_chunk, chunk_start, chunk_stop, part)
+                for (chunk_start, chunk_stop), part in zip(chunks, parts)
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                rendered += future.result()
+                print(f"\r{done}/{len(futures)} chunks", end="", flush=True)
+        print()
+        render_s = time.perf_counter() - start
+
+        stitch([part for part in parts if os.path.exists(part)], out_path, fps)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    total_s = time.perf_counter() - start
+    return {
+        "frames": rendered,
+        "workers": workers,
+        "render_s": render_s,
+        "total_s": total_s,
+        "render_fps": rendered / render_s if render_s else 0.0,
+        "fps": rendered / total_s if total_s else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render a session's annotated video without the UI."
+    )
+    parser.add_argument("session", help="session folder")
+    parser.add_argument("-o", "--output", help="output video (default: annotated.mp4)")
+    parser.add_argument(
+        "--from", dest="from_", type=int, default=0, help="first frame (default: 0)"
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_",
+        type=int,
+        default=None,
+        help="frame to stop before, exclusive, unlike the editor's inclusive"
+        " From/To fields (default: end of the video)",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--readers", action="store_true", help="draw the RFID reader locations"
+    )
+    args = parser.parse_args()
+
+    if args.from_ < 0 or (args.to_ is not None and args.to_ <= args.from_):
+        parser.error(f"empty frame range: --from {args.from_} --to {args.to_}")
+
+    out_path = args.output or os.path.join(args.session, "annotated.mp4")
+    try:
+        res = export_video(
+            args.session, out_path, args.from_, args.to_, args.workers, args.readers
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(
+        f"Wrote {res['frames']} frames to {out_path} in {res['total_s']:.1f}s"
+        f" ({res['fps']:.1f} fps, {res['render_fps']:.1f} fps rendering"
+        f" on {res['workers']} workers)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,139 @@
-import aspis.common as A
+import argparse
+import time
 import tkinter as tk
 
-from cv2.typing import MatLike
+from functools import partial
 from tkinter import filedialog, messagebox
+from typing import TYPE_CHECKING
 
-from data import loader, drawer, repo
-from ui import video_player, event_nav, edit_data
+from ui import startup
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from cv2.typing import MatLike
+    from data.loader import Data
+    from ui.frame_reader import FrameReader
+
+
+# Start of the process, for the start-up report
+STARTED = time.perf_counter()
+
+SAVE_POLL_MS = 100
+DEFAULT_AUTOSAVE_INTERVAL_S = 60
+
+
+def load_session(folder_path, streaming: bool, progress) -> "Data":
+    """Start-up job: the session's tracking data, RFID reads and edits."""
+    from data import loader
+
+    return loader.load_data(folder_path, streaming=streaming, progress=progress)
+
+
+def open_video(
+    folder_path, progress
+) -> tuple["FrameReader", "np.ndarray | None", "MatLike | None"]:
+    """Start-up job: the video reader, its keyframes and its decoded first frame."""
+    from data.keyframes import load_keyframes
+    from data.loader import Data
+    from ui.frame_reader import FrameReader
+
+    video_path = f"{folder_path}/{Data.VIDEO_FILE_NAME}.mp4"
+    progress("Reading keyframes", 0.0)
+    keyframes = load_keyframes(video_path)
+    progress("Opening video", 0.3)
+    reader = FrameReader(video_path, keyframes=keyframes)
+    progress("Decoding first frame", 0.6)
+    first_frame = reader.read(0)
+    progress("Video ready", 1.0)
+    return reader, keyframes, first_frame
+
+
+def main_application(
+    folder_path,
+    autosave_interval_s: int | None = None,
+    render_stats_path: str | None = None,
+    streaming: bool = False,
+    startup_timer: startup.StartupTimer | None = None,
+):
+    """
+    Run the main application after folder selection.
+
+    `autosave_interval_s` enables autosave at start-up; it can also be toggled
+    from the UI, where it defaults to DEFAULT_AUTOSAVE_INTERVAL_S. With
+    `render_stats_path`, render-loop timings are recorded for the whole session
+    and written there (JSON, or CSV for a `.csv` path) on exit. `streaming`
+    keeps only the tracks around the play head in memory, for very long sessions.
+
+    The window opens straight away with a progress view while the session data
+    and the video are loaded in parallel on worker threads; the session widgets
+    are built once both are ready.
+    """
+    timer = startup_timer or startup.StartupTimer()
+    timer.mark("folder")
 
-def main_application(folder_path):
-    """Run the main application after folder selection."""
     app = tk.Tk()
     app.title("Tracktor")
     app.geometry("1280x720")
     app.resizable(False, False)
 
-    # Load Data
-    cage_data = loader.load_data(folder_path)
+    loading_view = startup.LoadingView(app, ["Session", "Video"])
+    loading_view.frame.place(relx=0.5, rely=0.5, anchor="center")
+    app.update_idletasks()
+    timer.mark("window")
+
+    def on_ready(results):
+        loading_view.destroy()
+        reader, keyframes, first_frame = results["Video"]
+        session_window(
+            app,
+            folder_path,
+            results["Session"],
+            reader,
+            keyframes,
+            first_frame,
+            timer,
+            autosave_interval_s,
+            render_stats_path,
+        )
+
+    def on_error(job, e):
+        print(f"Could not load the {job.lower()}: {e}")
+        messagebox.showerror("Error", f"Could not load the {job.lower()}:\n{e}")
+        app.destroy()
+
+    startup.StartupLoader(
+        app,
+        {
+            "Session": partial(load_session, folder_path, streaming),
+            "Video": partial(open_video, folder_path),
+        },
+        on_progress=loading_view.update,
+        on_job_done=lambda job: timer.mark(job.lower()),
+        on_ready=on_ready,
+        on_error=on_error,
+    )
+
+    app.mainloop()
+
+
+def session_window(
+    app: tk.Tk,
+    folder_path,
+    cage_data: "Data",
+    reader: "FrameReader",
+    keyframes: "np.ndarray | None",
+    first_frame: "MatLike | None",
+    timer: startup.StartupTimer,
+    autosave_interval_s: int | None,
+    render_stats_path: str | None,
+):
+    """Build the session widgets in `app` around the loaded data and video."""
+    # Imported here so the folder dialog and the window don't wait for them
+    import aspis.common as A
+
+    from data import drawer, repo, saver
+    from ui import video_player, event_nav, edit_data, profiling
 
     # Configure grid layout for the root window
     app.columnconfigure(0, weight=3)
@@ -50,56 +167,217 @@ def main_application(folder_path):
     # Check Button
     show_rfid_reader_locations = tk.BooleanVar()
 
+    # Plain copy of the Tk settings, read by the render workers
+    overlay_settings = {"show_rfid_reader_locations": False}
+
+    def toggle_rfid_reader_locations():
+        overlay_settings["show_rfid_reader_locations"] = (
+            show_rfid_reader_locations.get()
+        )
+        vp.update()
+
     tk.Checkbutton(
         top_controls,
         text="Show RFID Reader Locations",
         variable=show_rfid_reader_locations,
-        command=lambda: (
-            show_rfid_reader_locations.set(not show_rfid_reader_locations.get())
-            or vp.update()
-        ),
+        command=toggle_rfid_reader_locations,
         justify="center",
     ).grid(row=0, column=1, sticky="ew")
 
+    # Background Saves
+    save_status = tk.Label(top_controls, text="", anchor="w")
+    save_status.grid(row=1, column=0, sticky="ew")
+
+    background_saver = saver.BackgroundSaver(
+        on_progress=lambda name, fraction: save_status.configure(
+            text=f"{name}: {fraction:.0%}"
+        ),
+        on_done=lambda name: save_status.configure(text=f"{name}: done"),
+        on_error=lambda name, e: save_status.configure(text=f"{name} failed: {e}"),
+    )
+
+    def poll_saves():
+        background_saver.poll()
+        app.after(SAVE_POLL_MS, poll_saves)
+
+    def save():
+        if repo.save_rfid_data_in_background(cage_data, background_saver):
+            save_status.configure(text="Saving...")
+
+    def export():
+        save_status.configure(text="Exporting...")
+        repo.export_rfid_data_in_background(cage_data, background_saver)
+
+    def compact():
+        # Compaction replaces the journal, so queued saves must land first
+        if background_saver.is_busy():
+            save_status.configure(text="Compact: waiting for saves to finish")
+            return
+
+        if not messagebox.askyesno(
+            "Compact Edits",
+            "Fold every edit into the session snapshot? This clears undo/redo.",
+        ):
+            return
+
+        save_status.configure(text="Compacting...")
+        app.update_idletasks()
+        try:
+            repo.compact_rfid_data(cage_data)
+        except OSError as e:
+            save_status.configure(text=f"Compact failed: {e}")
+        else:
+            save_status.configure(text="Compact: done")
+        update_undo_buttons()
+
     # Save Button
     tk.Button(
         top_controls,
         text="Save",
-        command=lambda: repo.save_rfid_data(cage_data),
+        command=save,
     ).grid(row=0, column=2, sticky="ew")
 
+    # Export Button
+    tk.Button(
+        top_controls,
+        text="Export CSV",
+        command=export,
+    ).grid(row=0, column=3, sticky="ew")
+
+    # Compact Button
+    tk.Button(
+        top_controls,
+        text="Compact Edits",
+        command=compact,
+    ).grid(row=2, column=0, sticky="ew")
+
+    # Autosave
+    autosave = tk.BooleanVar(value=autosave_interval_s is not None)
+    autosave_ms = 1000 * (autosave_interval_s or DEFAULT_AUTOSAVE_INTERVAL_S)
+
+    def autosave_tick():
+        if autosave.get():
+            save()
+        app.after(autosave_ms, autosave_tick)
+
+    tk.Checkbutton(
+        top_controls,
+        text=f"Autosave every {autosave_ms // 1000}s",
+        variable=autosave,
+        justify="center",
+    ).grid(row=1, column=1, sticky="ew")
+
+    # Edits only re-evaluate missing data over the frames they touched
+    def on_edit(frames):
+        removed, added = repo.update_missing_data(cage_data, frames)
+        event_navigator.patch("Missing Data", removed, added)
+        edit_frame.invalidate_runs()
+        update_undo_buttons()
+        vp.update()
+
+    def edit(yolo_id, rfid, from_=None, to_=None):
+        on_edit(repo.update_rfid_map(cage_data, yolo_id, rfid, from_, to_))
+
+    # Undo / Redo Buttons
+    def undo(_=None):
+        on_edit(repo.undo_rfid_update(cage_data))
+
+    def redo(_=None):
+        on_edit(repo.redo_rfid_update(cage_data))
+
+    undo_button = tk.Button(top_controls, text="Undo", command=undo)
+    undo_button.grid(row=1, column=2, sticky="ew")
+    redo_button = tk.Button(top_controls, text="Redo", command=redo)
+    redo_button.grid(row=1, column=3, sticky="ew")
+
+    def update_undo_buttons():
+        undo_button.configure(
+            state=tk.NORMAL if cage_data.journal.can_undo() else tk.DISABLED
+        )
+        redo_button.configure(
+            state=tk.NORMAL if cage_data.journal.can_redo() else tk.DISABLED
+        )
+
+    update_undo_buttons()
+    app.bind("<Control-z>", undo)
+    app.bind("<Control-y>", redo)
+
     # Video Player
-    def draw(frame: MatLike, frame_number: int):
-        if show_rfid_reader_locations.get():
-            frame = drawer.draw_rfid_reader_locations(
-                cage_data.rfid_reader_locations_df, frame
-            )
+    def first_frame_shown():
+        timer.mark("first frame")
+        print(timer.report("folder"))
+        save_status.configure(
+            text=f"Ready in {timer.since('first frame', 'folder'):.2f}s"
+        )
+
+    reader_layer = drawer.ReaderLayer(cage_data.rfid_reader_locations_df)
+
+    def draw(frame: "MatLike", frame_number: int, scale: tuple[float, float]):
+        if overlay_settings["show_rfid_reader_locations"]:
+            frame = reader_layer.draw(frame, scale)
 
-        frame = drawer.draw_bboxes(cage_data.df, frame, frame_number)
+        frame = drawer.draw_bboxes(cage_data.tracks, frame, frame_number, scale)
         return frame
 
-    vp = video_player.VideoPlayer(left_col, cage_data.video_path, draw_fn=draw)
+    vp = video_player.VideoPlayer(
+        left_col,
+        cage_data.video_path,
+        draw_fn=draw,
+        keyframes=keyframes,
+        timings=profiling.StageTimings(enabled=render_stats_path is not None),
+        reader=reader,
+        first_frame=first_frame,
+        on_first_frame=first_frame_shown,
+    )
     vp.vp_frame.grid(row=2, column=0, sticky="nsew")
 
+    # Render Stats HUD
+    show_render_stats = tk.BooleanVar()
+    tk.Checkbutton(
+        top_controls,
+        text="Show Render Stats",
+        variable=show_render_stats,
+        command=lambda: vp.show_hud(show_render_stats.get()),
+        justify="center",
+    ).grid(row=2, column=2, columnspan=2, sticky="ew")
+
     # Editable Table
     edit_frame = edit_data.EditFrame(
         right_col,
         cage_data.rfids,
-        A.curry(repo.get_frame_data)(cage_data.df),
-        A.compose(lambda _: vp.update(), A.curry(repo.update_rfid_map)(cage_data.df)),
+        A.curry(repo.get_frame_data)(cage_data.tracks),
+        edit,
         height=200,
         width=500,
+        is_playing=vp.vp_state.is_playing,
+        get_track_fn=partial(repo.get_track_info, cage_data.track_intervals),
+        seek_fn=lambda k: vp.update(k),
     )
     edit_frame.frame.grid(row=0, column=1, sticky="")
     edit_frame.frame.grid_propagate(False)
     vp.bind_update_callback(edit_frame.update)
 
+    # Editor refresh during playback
+    refresh_editor = tk.BooleanVar(value=True)
+
+    def toggle_refresh_editor():
+        edit_frame.refresh_while_playing = refresh_editor.get()
+        edit_frame.refresh()
+
+    tk.Checkbutton(
+        top_controls,
+        text="Update Editor While Playing",
+        variable=refresh_editor,
+        command=toggle_refresh_editor,
+        justify="center",
+    ).grid(row=2, column=1, sticky="ew")
+
     # Event List
     event_navigator = event_nav.EventNavigator(
         right_col,
         {
             "Missing Data": [
-                lambda: repo.get_missing_data(cage_data.df),
+                lambda: repo.get_missing_data(cage_data.missing_data),
                 lambda k: vp.update(k),
             ],
             "RFID Reads": [
@@ -112,20 +390,64 @@ def main_application(folder_path):
     )
     event_navigator.notebook.grid(row=1, column=1, sticky="")
     event_navigator.notebook.grid_propagate(False)
-    edit_frame.bind_update_callback(lambda _: event_navigator.update())
 
-    app.mainloop()
+    # Let queued saves finish before closing
+    def on_close():
+        if cage_data.journal.has_unsaved_changes():
+            answer = messagebox.askyesnocancel(
+                "Unsaved Edits", "Save your edits before closing?"
+            )
+            if answer is None:
+                return
+            if answer:
+                save()
+
+        save_status.configure(text="Finishing saves...")
+        app.update_idletasks()
+        background_saver.shutdown()
+        if cage_data.streaming:
+            cage_data.tracks.close()
+
+        if render_stats_path is not None:
+            vp.timings.export(render_stats_path)
+        app.destroy()
+
+    app.protocol("WM_DELETE_WINDOW", on_close)
+    app.after(SAVE_POLL_MS, poll_saves)
+    app.after(autosave_ms, autosave_tick)
 
 
 def run():
     """Handle folder selection and initialize the main application."""
+    timer = startup.StartupTimer(STARTED)
+    startup.preload_modules()
+
+    parser = argparse.ArgumentParser(description="Tracktor")
+    parser.add_argument(
+        "--render-stats",
+        metavar="PATH",
+        help="record render-loop timings and write them to PATH (.json or .csv)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="load the tracks around the play head only, for very large sessions",
+    )
+    args = parser.parse_args()
+
     root = tk.Tk()
     root.withdraw()
 
+    timer.mark("dialog")
     folder_path = filedialog.askdirectory(title="Choose date")
 
     if folder_path:
-        main_application(folder_path)
+        main_application(
+            folder_path,
+            render_stats_path=args.render_stats,
+            streaming=args.stream,
+            startup_timer=timer,
+        )
     else:
         messagebox.showwarning("Warning", "Please select a folder to proceed.")
         root.destroy()
@@ -0,0 +1,167 @@
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from data import loader, repo
+from data.cache import CACHE_DIR_NAME
+from data.tracks import NO_RFID
+
+
+# Summary columns holding counts, kept as integers alongside failed sessions
+COUNT_COLUMNS = [
+    "frames",
+    "missing_intervals",
+    "missing_frames",
+    "reads",
+    "unaligned_reads",
+    "tags",
+    "tags_read",
+    "tags_tracked",
+]
+
+
+def find_sessions(root: str) -> list[str]:
+    """Folders under `root` holding a tracking results file."""
+    tracking_file = f"{loader.Data.TRACKING_RESULTS_FILE_NAME}.csv"
+    sessions = []
+
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(d for d in dir_names if d != CACHE_DIR_NAME)
+        if tracking_file in file_names:
+            sessions.append(dir_path)
+
+    return sessions
+
+
+def check_session(session_path: str, use_cache: bool = True) -> tuple[dict, dict]:
+    """QC summary and stage timings (in seconds) of one session."""
+    timings = {"session": session_path}
+    summary = {"session": session_path}
+
+    start = time.perf_counter()
+    data = loader.Data(session_path, use_cache=use_cache)
+    timings["load_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    missing_data = repo.get_missing_data(data.missing_data)
+    summary["frames"] = len(data.tracks)
+    summary["missing_intervals"] = len(missing_data)
+    summary["missing_frames"] = int(data.missing_data.mismatch.sum())
+    summary["missing_pct"] = 100 * data.missing_data.mismatch.mean()
+    timings["missing_data_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reads = data.rfid_reads_df
+    summary["reads"] = len(reads)
+    summary["unaligned_reads"] = int((reads["frame"].to_numpy() < 0).sum())
+    for reader, count in reads["Reader"].value_counts().sort_index().items():
+        summary[f"reads_reader_{reader}"] = int(count)
+    timings["reads_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tags = np.asarray(data.rfids, dtype=np.int64)
+    summary["tags"] = len(tags)
+    summary["tags_read"] = int(np.isin(tags, reads["RFID"].to_numpy()).sum())
+    summary["tags_tracked"] = int(np.isin(tags, data.tracks.rfids).sum())
+    labelled = data.tracks.rfids != NO_RFID
+    summary["labelled_pct"] = 100 * labelled.mean() if len(labelled) else 0.0
+    timings["coverage_s"] = time.perf_counter() - start
+
+    timings["total_s"] = sum(v for k, v in timings.items() if k.endswith("_s"))
+    return summary, timings
+
+
+def _check_session(session_path: str, use_cache: bool) -> tuple[dict, dict]:
+    try:
+        return check_session(session_path, use_cache)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return {"session": session_path, "error": error}, {"session": session_path}
+
+
+def qc_report(
+    root: str, workers: int | None = None, use_cache: bool = True
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Check every session under `root` in parallel worker processes."""
+    sessions = find_sessions(root)
+    summaries = []
+    timings = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_check_session, session, use_cache) for session in sessions
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            summary, timing = future.result()
+            summaries.append(summary)
+            timings.append(timing)
+            print(f"\r{done}/{len(futures)} sessions", end="", flush=True)
+    print()
+
+    summary_df = pd.DataFrame(summaries, columns=None if summaries else ["session"])
+    timings_df = pd.DataFrame(timings, columns=None if timings else ["session"])
+    failed = (
+        summary_df["error"].notna()
+        if "error" in summary_df
+        else pd.Series(False, index=summary_df.index)
+    )
+
+    # Reader columns only exist for the readers a session saw
+    reader_cols = sorted(
+        (c for c in summary_df.columns if c.startswith("reads_reader_")),
+        key=lambda c: int(c.rsplit("_", 1)[-1]),
+    )
+    readers = summary_df.loc[~failed, reader_cols]
+    summary_df.loc[~failed, reader_cols] = readers.fillna(0)
+
+    count_cols = [c for c in COUNT_COLUMNS if c in summary_df] + reader_cols
+    summary_df[count_cols] = summary_df[count_cols].astype("Int64")
+    summary_df = summary_df[
+        [c for c in summary_df.columns if c not in reader_cols and c != "error"]
+        + reader_cols
+        + (["error"] if "error" in summary_df else [])
+    ]
+
+    return (
+        summary_df.sort_values("session", ignore_index=True),
+        timings_df.sort_values("session", ignore_index=True),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="QC report of every session folder under a root directory."
+    )
+    parser.add_argument("root", help="directory holding the session folders")
+    parser.add_argument("-o", "--output", help="summary CSV; timings go next to it")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="parse every session instead of using and writing the session cache",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary, timings = qc_report(args.root, args.workers, not args.no_cache)
+    elapsed = time.perf_counter() - start
+
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(summary.to_string(index=False, float_format="{:.2f}".format))
+        print()
+        print(timings.to_string(index=False, float_format="{:.3f}".format))
+
+    print(f"\nChecked {len(summary)} sessions in {elapsed:.1f}s")
+
+    if args.output:
+        root, ext = os.path.splitext(args.output)
+        summary.to_csv(args.output, index=False)
+        timings.to_csv(f"{root}_timings{ext or '.csv'}", index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import pytest
+
+from benchmarks.synthetic import write_session
+
+
+N_FRAMES = 3_000
+
+
+@pytest.fixture(scope="session")
+def session_path(tmp_path_factory) -> str:
+    """A synthetic session, shared read-only by the tests."""
+    return write_session(str(tmp_path_factory.mktemp("session")), N_FRAMES)
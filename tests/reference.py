@@ -0,0 +1,148 @@
+import ast
+import copy
+import numpy as np
+import pandas as pd
+
+from data import repo
+from data.loader import Data
+from data.tracks import NO_RFID
+
+
+class ReferenceSession:
+    """
+    The list-of-lists session the columnar stores replaced, as the baseline the
+    tests compare against.
+
+    Frame data, missing data and RFID edits follow the original repo functions;
+    undo and redo restore and re-apply whole copies of the RFID column.
+    """
+
+    def __init__(self, path: str):
+        df = pd.read_csv(f"{path}/{Data.TRACKING_RESULTS_FILE_NAME}.csv")
+        df = df[Data.TRACKING_COLS].copy()
+        df["frame"] = df["frame"].astype(int) - 1
+        df["sort_tracks"] = df["sort_tracks"].apply(ast.literal_eval)
+        df["RFID_tracks"] = df["RFID_tracks"].apply(ast.literal_eval)
+        self.df = df
+
+        self._done: list[tuple[tuple, list]] = []
+        self._undone: list[tuple] = []
+
+    def frame_data(self) -> dict[int, dict]:
+        """What `get_frame_data` returned for every frame."""
+        res = {}
+        for frame, sort_tracks, rfid_tracks in zip(
+            self.df["frame"], self.df["sort_tracks"], self.df["RFID_tracks"]
+        ):
+            yolo_to_rfid = {}
+            for track in sort_tracks:
+                yolo_to_rfid[track[-1]] = None
+                for rfid_track in rfid_tracks:
+                    if rfid_track[:4] == track[:4]:
+                        yolo_to_rfid[track[-1]] = rfid_track[-1]
+            res[int(frame)] = yolo_to_rfid
+        return res
+
+    def missing_frames(self) -> list[int]:
+        """Frames `get_missing_data` listed: the first of every unlabelled run."""
+        mismatch = self.df["RFID_tracks"].apply(len) != self.df["sort_tracks"].apply(
+            len
+        )
+        starts = mismatch & ~mismatch.shift(fill_value=False)
+        return self.df["frame"][starts].tolist()
+
+    def track_segments(self) -> list[tuple[int, int, int, int]]:
+        """(yolo, first, last, rfid) of every run of frames keeping one RFID."""
+        runs: dict[int, list[list[int]]] = {}
+        for frame, tracks in sorted(self.frame_data().items()):
+            for yolo, rfid in tracks.items():
+                rfid = NO_RFID if rfid is None else rfid
+                segments = runs.setdefault(yolo, [])
+                last = segments[-1] if segments else None
+                if last is not None and last[1] == frame - 1 and last[2] == rfid:
+                    last[1] = frame
+                else:
+                    segments.append([frame, frame, rfid])
+        return [
+            (yolo, start, end, rfid)
+            for yolo in sorted(runs)
+            for start, end, rfid in runs[yolo]
+        ]
+
+    def edit(self, yolo_id: int, rfid: int, from_=None, to_=None) -> None:
+        self._done.append(((yolo_id, rfid, from_, to_), self._rfid_column()))
+        self._undone.clear()
+        self._update_rfid_map(yolo_id, rfid, from_, to_)
+
+    def undo(self) -> None:
+        if self._done:
+            args, column = self._done.pop()
+            self.df["RFID_tracks"] = column
+            self._undone.append(args)
+
+    def redo(self) -> None:
+        if self._undone:
+            args = self._undone.pop()
+            self._done.append((args, self._rfid_column()))
+            self._update_rfid_map(*args)
+
+    def _rfid_column(self) -> list:
+        return copy.deepcopy(self.df["RFID_tracks"].tolist())
+
+    def _update_rfid_map(self, yolo_id, update_rfid, from_, to_) -> None:
+        df = self.df
+        if from_ is None:
+            from_ = int(df["frame"].min())
+        if to_ is None:
+            to_ = int(df["frame"].max())
+
+        contains_yolo_id = df["sort_tracks"].apply(
+            lambda tracks: any(track[-1] == yolo_id for track in tracks)
+        )
+        mask = (df["frame"] >= from_) & (df["frame"] <= to_) & contains_yolo_id
+
+        for idx, row in df[mask].iterrows():
+            sort_tracks = row["sort_tracks"]
+            rfid_tracks = row["RFID_tracks"]
+            track = next(t for t in sort_tracks if t[-1] == yolo_id)
+            rfid_track = next((t for t in rfid_tracks if t[:4] == track[:4]), None)
+            if rfid_track:
+                rfid_track[-1] = update_rfid
+            else:
+                rfid_tracks.append(track[:4] + [update_rfid])
+            df.at[idx, "RFID_tracks"] = rfid_tracks
+
+
+def frame_data(data: Data) -> dict[int, dict]:
+    """`repo.get_frame_data` of every frame of a loaded session."""
+    return {
+        int(frame): repo.get_frame_data(data.tracks, int(frame))
+        for frame in data.df["frame"]
+    }
+
+
+def random_steps(data: Data, ref: ReferenceSession, n_steps: int, seed: int = 0):
+    """
+    Make the same random edits, undos and redos on `data` through `repo` and on
+    `ref`; yields after every step with the frames it touched.
+    """
+    rng = np.random.default_rng(seed)
+    yolo_ids = sorted({y for tracks in ref.frame_data().values() for y in tracks})
+    n_frames = len(ref.df)
+
+    for _ in range(n_steps):
+        kind = rng.choice(["edit", "edit", "undo", "redo"])
+        if kind == "edit":
+            yolo_id = int(rng.choice(yolo_ids))
+            rfid = int(rng.choice(data.rfids))
+            from_ = None if rng.random() < 0.1 else int(rng.integers(0, n_frames))
+            to_ = None if rng.random() < 0.1 else int(rng.integers(0, n_frames))
+            frames = repo.update_rfid_map(data, yolo_id, rfid, from_, to_)
+            ref.edit(yolo_id, rfid, from_, to_)
+        elif kind == "undo":
+            frames = repo.undo_rfid_update(data)
+            ref.undo()
+        else:
+            frames = repo.redo_rfid_update(data)
+            ref.redo()
+        yield frames
@@ -0,0 +1,67 @@
+import pytest
+
+from data import repo
+from data.intervals import TrackIntervals
+from data.loader import Data
+
+from .reference import random_steps, ReferenceSession
+
+
+def segments(intervals: TrackIntervals) -> list[tuple[int, int, int, int]]:
+    """Every segment, looked up one track at a time."""
+    return [
+        (int(yolo), int(start), int(end), int(rfid))
+        for yolo in intervals.ids
+        for start, end, rfid in zip(*intervals.segments(yolo))
+    ]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_segments_match_baseline(session_path, streaming):
+    data = Data(session_path, use_cache=False, streaming=streaming)
+    ref = ReferenceSession(session_path)
+    assert segments(data.track_intervals) == ref.track_segments()
+    if streaming:
+        data.tracks.close()
+
+
+def test_track_info_matches_baseline(session_path):
+    data = Data(session_path, use_cache=False)
+    ref = ReferenceSession(session_path)
+
+    by_yolo: dict[int, list[tuple[int, int, int]]] = {}
+    for yolo, start, end, rfid in ref.track_segments():
+        by_yolo.setdefault(yolo, []).append((start, end, rfid))
+
+    for yolo, runs in by_yolo.items():
+        # Neighbouring segments with the same RFID form one run across gaps
+        merged = [list(runs[0])]
+        for start, end, rfid in runs[1:]:
+            if rfid == merged[-1][2]:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end, rfid])
+
+        for start, end, _ in merged:
+            info = repo.get_track_info(data.track_intervals, yolo, start)
+            later = [s for s, _, _ in merged if s > start]
+            assert info == {
+                "first": runs[0][0],
+                "last": runs[-1][1],
+                "run_start": start,
+                "run_end": end,
+                "next_change": later[0] if later else None,
+            }
+
+
+def test_updates_match_baseline(session_path):
+    data = Data(session_path, use_cache=False)
+    ref = ReferenceSession(session_path)
+
+    for step, _ in enumerate(random_steps(data, ref, 200), start=1):
+        if step % 25 == 0:
+            expected = ref.track_segments()
+            assert segments(data.track_intervals) == expected, f"after step {step}"
+
+    rebuilt = TrackIntervals(data.tracks)
+    assert segments(rebuilt) == ref.track_segments()
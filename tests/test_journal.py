@@ -0,0 +1,153 @@
+import os
+import numpy as np
+
+from data.cache import file_signature
+from data.journal import EditJournal, REJECTED_FILE_SUFFIX
+from data.tracks import NO_RFID, TrackStore
+
+
+N_FRAMES = 10
+
+
+def make_tracks() -> TrackStore:
+    """One detection of YOLO ID 1 per frame, unlabelled."""
+    boxes = np.zeros((N_FRAMES, 5), dtype=np.int32)
+    boxes[:, 4] = 1
+    return TrackStore(
+        np.arange(N_FRAMES),
+        boxes,
+        np.full(N_FRAMES, NO_RFID, dtype=np.int64),
+        np.arange(N_FRAMES + 1),
+    )
+
+
+def reload(base_path: str) -> EditJournal:
+    journal = EditJournal(make_tracks(), base_path)
+    journal.replay()
+    return journal
+
+
+def crash_mid_append(journal: EditJournal) -> None:
+    with open(journal.journal_path, "a") as f:
+        f.write('{"op": "set", "yolo_id": 1, "rf')
+
+
+def test_save_after_crash_survives_reloads(tmp_path):
+    base_path = str(tmp_path / "tracking_results.csv")
+    open(base_path, "w").close()
+
+    journal = reload(base_path)
+    journal.apply(1, 100, 0, 2)
+    journal.flush()
+    crash_mid_append(journal)
+
+    journal = reload(base_path)
+    assert journal.tracks.rfids.tolist()[:4] == [100, 100, 100, NO_RFID]
+    journal.apply(1, 200, 3, 5)
+    journal.flush()
+
+    journal = reload(base_path)
+    assert journal.tracks.rfids.tolist()[3:7] == [200, 200, 200, NO_RFID]
+    journal.apply(1, 300, 6, 9)
+    journal.flush()
+
+    journal = reload(base_path)
+    assert journal.tracks.rfids.tolist() == [100] * 3 + [200] * 3 + [300] * 4
+    assert len(journal) == 3
+
+
+def test_save_onto_torn_tail_without_reload(tmp_path):
+    base_path = str(tmp_path / "tracking_results.csv")
+    open(base_path, "w").close()
+
+    journal = reload(base_path)
+    journal.apply(1, 100)
+    journal.flush()
+    crash_mid_append(journal)
+    journal.apply(1, 200, 5, None)
+    journal.flush()
+
+    journal = reload(base_path)
+    assert journal.tracks.rfids.tolist() == [100] * 5 + [200] * 5
+
+
+def test_journal_of_another_tracking_file_is_set_aside(tmp_path):
+    base_path = str(tmp_path / "tracking_results.csv")
+    open(base_path, "w").close()
+
+    journal = reload(base_path)
+    journal.apply(1, 100)
+    journal.flush()
+
+    # The tracking file is regenerated
+    with open(base_path, "w") as f:
+        f.write("frame,sort_tracks,RFID_tracks\n")
+
+    journal = reload(base_path)
+    assert journal.tracks.rfids.tolist() == [NO_RFID] * N_FRAMES
+    assert os.path.exists(journal.journal_path + REJECTED_FILE_SUFFIX)
+
+    journal.apply(1, 200)
+    journal.flush()
+    assert reload(base_path).tracks.rfids.tolist() == [200] * N_FRAMES
+
+
+def test_replay_stops_at_a_corrupt_record(tmp_path):
+    base_path = str(tmp_path / "tracking_results.csv")
+    open(base_path, "w").close()
+
+    journal = reload(base_path)
+    journal.apply(1, 100, 0, 4)
+    journal.flush()
+    with open(journal.journal_path, "a") as f:
+        f.write('{"op": "set", "yolo_id": 1}\n')
+    journal.apply(1, 200, 5, 9)
+    journal.flush()
+
+    journal = reload(base_path)
+    assert journal.tracks.rfids.tolist() == [100] * 5 + [NO_RFID] * 5
+    assert os.path.exists(journal.journal_path + REJECTED_FILE_SUFFIX)
+
+    journal.apply(1, 300, 5, 9)
+    journal.flush()
+    assert reload(base_path).tracks.rfids.tolist() == [100] * 5 + [300] * 5
+
+
+def write_legacy_snapshot(journal: EditJournal, rfids: np.ndarray) -> None:
+    """A snapshot as compacted before snapshots were memory-mapped."""
+    signature = file_signature(journal.base_path)
+    np.savez(
+        journal.legacy_snapshot_path,
+        rfids=rfids,
+        size=signature["size"],
+        mtime_ns=signature["mtime_ns"],
+    )
+
+
+def test_legacy_snapshot_is_loaded_and_replaced_on_compaction(tmp_path):
+    base_path = str(tmp_path / "tracking_results.csv")
+    open(base_path, "w").close()
+
+    journal = reload(base_path)
+    write_legacy_snapshot(journal, np.arange(N_FRAMES, dtype=np.int64))
+    journal.apply(1, 100, 8, 9)
+    journal.flush()
+
+    journal = reload(base_path)
+    assert journal.tracks.rfids.tolist() == list(range(8)) + [100, 100]
+
+    journal.compact()
+    assert not os.path.exists(journal.legacy_snapshot_path)
+    assert reload(base_path).tracks.rfids.tolist() == list(range(8)) + [100, 100]
+
+
+def test_legacy_snapshot_of_another_tracking_file_is_ignored(tmp_path):
+    base_path = str(tmp_path / "tracking_results.csv")
+    open(base_path, "w").close()
+
+    journal = reload(base_path)
+    write_legacy_snapshot(journal, np.arange(N_FRAMES, dtype=np.int64))
+    with open(base_path, "w") as f:
+        f.write("frame,sort_tracks,RFID_tracks\n")
+
+    assert reload(base_path).tracks.rfids.tolist() == [NO_RFID] * N_FRAMES
@@ -0,0 +1,101 @@
+import cv2
+import os
+import struct
+import numpy as np
+
+from data.keyframes import load_keyframes, parse_keyframes
+from ui.frame_reader import FrameReader
+
+
+def box(box_type: bytes, *children: bytes) -> bytes:
+    payload = b"".join(children)
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def trak(handler: bytes, *stbl: bytes) -> bytes:
+    hdlr = box(b"hdlr", bytes(8), handler, bytes(12))
+    return box(b"trak", box(b"mdia", hdlr, box(b"minf", box(b"stbl", *stbl))))
+
+
+def stss(*samples: int) -> bytes:
+    return box(b"stss", struct.pack(f">II{len(samples)}I", 0, len(samples), *samples))
+
+
+def stsz(count: int) -> bytes:
+    return box(b"stsz", struct.pack(">III", 0, 0, count))
+
+
+def write_mp4(path, *traks: bytes) -> str:
+    """An MP4 with the media data ahead of `moov`, as our cameras write it."""
+    with open(path, "wb") as f:
+        f.write(box(b"ftyp", b"isom", bytes(4)))
+        f.write(box(b"mdat", bytes(64)))
+        f.write(box(b"moov", box(b"mvhd", bytes(100)), *traks))
+    return str(path)
+
+
+def test_sync_samples_of_the_video_track(tmp_path):
+    path = write_mp4(
+        tmp_path / "video.mp4",
+        trak(b"soun", stss(1, 2, 3), stsz(3)),
+        trak(b"vide", stsz(40), stss(1, 13, 25, 37)),
+    )
+    assert parse_keyframes(path).tolist() == [0, 12, 24, 36]
+
+
+def test_every_sample_is_a_keyframe_without_stss(tmp_path):
+    path = write_mp4(tmp_path / "video.mp4", trak(b"vide", stsz(5)))
+    assert parse_keyframes(path).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_unparseable_files(tmp_path):
+    assert parse_keyframes(write_mp4(tmp_path / "audio.mp4", trak(b"soun"))) is None
+
+    path = write_mp4(tmp_path / "video.mp4", trak(b"vide", stss(1, 13, 25, 37)))
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 6)
+    assert parse_keyframes(path) is None
+
+    assert parse_keyframes(str(tmp_path / "missing.mp4")) is None
+
+
+def test_cached_index_is_rebuilt_when_the_video_changes(tmp_path):
+    path = write_mp4(tmp_path / "video.mp4", trak(b"vide", stss(1, 13)))
+    assert load_keyframes(path).tolist() == [0, 12]
+    assert load_keyframes(path).tolist() == [0, 12]
+
+    write_mp4(tmp_path / "video.mp4", trak(b"vide", stss(1, 7, 13, 19)))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert np.array_equal(load_keyframes(path), [0, 6, 12, 18])
+
+
+def test_keyframe_seeks_match_sequential_decoding(tmp_path):
+    path = str(tmp_path / "video.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 25, (64, 48))
+    for i in range(120):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        cv2.circle(frame, (i % 64, 8 + i // 8), 6, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+    cap = cv2.VideoCapture(path)
+    decoded = []
+    while (frame := cap.read()[1]) is not None:
+        decoded.append(frame)
+    cap.release()
+
+    keyframes = parse_keyframes(path)
+    assert keyframes[0] == 0 and 1 < len(keyframes) < len(decoded)
+
+    reader = FrameReader(path, keyframes=keyframes)
+    try:
+        order = np.random.default_rng(0).integers(0, len(decoded), 200)
+        for frame_number in order.tolist():
+            assert np.array_equal(reader.read(frame_number), decoded[frame_number])
+
+            keyframe, frame = reader.read_keyframe(frame_number)
+            assert keyframe in keyframes and keyframe <= frame_number
+            assert np.array_equal(frame, decoded[keyframe])
+    finally:
+        reader.close()
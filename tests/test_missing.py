@@ -0,0 +1,53 @@
+import numpy as np
+
+from data import repo
+from data.loader import Data
+from data.missing import MissingDataIndex
+
+from .reference import random_steps, ReferenceSession
+
+
+def test_missing_data_matches_baseline(session_path):
+    data = Data(session_path, use_cache=False)
+    ref = ReferenceSession(session_path)
+    assert data.missing_data.start_frames().tolist() == ref.missing_frames()
+
+
+def test_incremental_updates_match_baseline(session_path):
+    data = Data(session_path, use_cache=False)
+    ref = ReferenceSession(session_path)
+
+    # The event list is patched with what every update reports as changed
+    patched = set(data.missing_data.start_frames().tolist())
+    for step, frames in enumerate(random_steps(data, ref, 200), start=1):
+        if frames is None:
+            frames = np.empty(0, dtype=np.int64)
+        removed, added = data.missing_data.update(frames)
+        patched = (patched - set(removed.tolist())) | set(added.tolist())
+
+        expected = ref.missing_frames()
+        assert sorted(patched) == expected, f"after step {step}"
+        assert data.missing_data.start_frames().tolist() == expected
+
+    rebuilt = MissingDataIndex(data.tracks)
+    assert rebuilt.start_frames().tolist() == ref.missing_frames()
+
+
+def test_labelling_the_first_row_of_a_run_moves_its_start(session_path):
+    data = Data(session_path, use_cache=False)
+    ref = ReferenceSession(session_path)
+
+    # A run of at least two rows, so the next row starts it once the first is done
+    missing = set(ref.missing_frames())
+    mismatch = data.missing_data.mismatch
+    frame = next(f for f in sorted(missing) if mismatch[f + 1])
+
+    patched = set(missing)
+    for yolo_id in ref.frame_data()[frame]:
+        touched = repo.update_rfid_map(data, yolo_id, data.rfids[0], frame, frame)
+        ref.edit(yolo_id, data.rfids[0], frame, frame)
+        removed, added = data.missing_data.update(touched)
+        patched = (patched - set(removed.tolist())) | set(added.tolist())
+
+    assert frame not in patched and frame + 1 in patched
+    assert sorted(patched) == ref.missing_frames()
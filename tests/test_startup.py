@@ -0,0 +1,91 @@
+import shutil
+import time
+
+import main
+
+from data.cache import CACHE_DIR_NAME
+from ui.startup import StartupLoader
+
+from .reference import frame_data, ReferenceSession
+
+
+class FakeRoot:
+    """Runs `after` callbacks in order when `run` pumps them, without Tk."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def run(self, timeout_s: float = 10.0) -> None:
+        deadline = time.monotonic() + timeout_s
+        while self.pending:
+            assert time.monotonic() < deadline, "start-up never finished"
+            time.sleep(0.001)
+            self.pending.pop(0)()
+
+
+def test_load_session_matches_baseline(session_path, tmp_path):
+    path = shutil.copytree(session_path, tmp_path / "session")
+    ref = ReferenceSession(str(path))
+
+    # Parsed the first time, read back from the cache the second
+    for _ in range(2):
+        fractions = []
+        data = main.load_session(
+            str(path), False, lambda stage, fraction: fractions.append(fraction)
+        )
+        assert fractions == sorted(fractions) and fractions[-1] == 1.0
+        assert frame_data(data) == ref.frame_data()
+        assert (path / CACHE_DIR_NAME).is_dir()
+
+
+def test_loader_hands_every_result_to_on_ready():
+    root = FakeRoot()
+    events = []
+
+    def job(result):
+        def run(progress):
+            progress("working", 0.5)
+            return result
+
+        return run
+
+    StartupLoader(
+        root,
+        {"data": job(1), "video": job(2)},
+        on_progress=lambda name, stage, fraction: events.append((name, fraction)),
+        on_job_done=lambda name: events.append(name),
+        on_ready=lambda results: events.append(results),
+        on_error=lambda name, e: events.append(e),
+    )
+    root.run()
+
+    assert sorted(e for e in events if isinstance(e, tuple)) == [
+        ("data", 0.5),
+        ("video", 0.5),
+    ]
+    assert sorted(e for e in events if isinstance(e, str)) == ["data", "video"]
+    assert events[-1] == {"data": 1, "video": 2}
+
+
+def test_loader_reports_the_first_error_once():
+    root = FakeRoot()
+    ready, errors = [], []
+
+    def fail(progress):
+        raise ValueError("bad session")
+
+    StartupLoader(
+        root,
+        {"data": fail, "video": fail, "other": lambda progress: 3},
+        on_progress=lambda *args: None,
+        on_job_done=lambda name: None,
+        on_ready=ready.append,
+        on_error=lambda name, e: errors.append((name, str(e))),
+    )
+    root.run()
+
+    assert ready == []
+    assert len(errors) == 1 and errors[0][1] == "bad session"
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from data import loader, repo, streaming
+from data.loader import Data
+
+from .reference import frame_data, random_steps, ReferenceSession
+
+
+CHUNK_ROWS = 200
+MAX_RESIDENT = 2
+
+
+@pytest.fixture
+def data(session_path, monkeypatch) -> Data:
+    """The session streamed in small chunks, with at most two of them resident."""
+    monkeypatch.setattr(
+        loader, "index_rows", lambda path: streaming.index_rows(path, CHUNK_ROWS)
+    )
+    data = Data(session_path, use_cache=False, streaming=True)
+    data.tracks.max_resident = MAX_RESIDENT
+    data.tracks.prefetch = 0
+    yield data
+    data.tracks.close()
+
+
+def test_frame_data_matches_baseline_with_eviction(data, session_path):
+    ref = ReferenceSession(session_path)
+    assert len(ref.df) > CHUNK_ROWS * MAX_RESIDENT * 4
+
+    for frame, expected in ref.frame_data().items():
+        assert repo.get_frame_data(data.tracks, frame) == expected
+        assert len(data.tracks.resident_chunks()) <= MAX_RESIDENT
+
+
+def test_edits_to_chunks_that_are_not_loaded(data, session_path):
+    ref = ReferenceSession(session_path)
+    n_frames = len(ref.df)
+    repo.get_frame_data(data.tracks, 0)
+    yolo_id = next(iter(ref.frame_data()[n_frames - 1]))
+
+    # Both ends of the session are edited while only the first chunk is resident
+    repo.update_rfid_map(data, yolo_id, data.rfids[1], n_frames // 2, None)
+    ref.edit(yolo_id, data.rfids[1], n_frames // 2, None)
+    repo.update_rfid_map(data, yolo_id, data.rfids[2], None, n_frames // 4)
+    ref.edit(yolo_id, data.rfids[2], None, n_frames // 4)
+    repo.undo_rfid_update(data)
+    ref.undo()
+    assert len(data.tracks.resident_chunks()) <= MAX_RESIDENT
+
+    assert frame_data(data) == ref.frame_data()
+
+
+def test_edits_undo_and_redo_match_baseline(data, session_path):
+    ref = ReferenceSession(session_path)
+    rng = np.random.default_rng(1)
+
+    patched = set(data.missing_data.start_frames().tolist())
+    for step, frames in enumerate(random_steps(data, ref, 200), start=1):
+        # Playback somewhere else in between, so edited chunks get evicted
+        repo.get_frame_data(data.tracks, int(rng.integers(0, len(ref.df))))
+
+        if frames is None:
+            frames = np.empty(0, dtype=np.int64)
+        removed, added = data.missing_data.update(frames)
+        patched = (patched - set(removed.tolist())) | set(added.tolist())
+        assert sorted(patched) == ref.missing_frames(), f"after step {step}"
+
+        if step % 50 == 0:
+            assert frame_data(data) == ref.frame_data(), f"after step {step}"
+            assert len(data.tracks.resident_chunks()) <= MAX_RESIDENT
@@ -0,0 +1,17 @@
+from data.loader import Data
+
+from .reference import frame_data, random_steps, ReferenceSession
+
+
+def test_frame_data_matches_baseline(session_path):
+    data = Data(session_path, use_cache=False)
+    assert frame_data(data) == ReferenceSession(session_path).frame_data()
+
+
+def test_edits_undo_and_redo_match_baseline(session_path):
+    data = Data(session_path, use_cache=False)
+    ref = ReferenceSession(session_path)
+
+    for step, _ in enumerate(random_steps(data, ref, 200), start=1):
+        if step % 25 == 0:
+            assert frame_data(data) == ref.frame_data(), f"after step {step}"
@@ -4,7 +4,129 @@ from collections.abc import Callable
 from typing import Dict
 
 
+class EditRow:
+    """The widgets editing one YOLO ID, kept around and reused across frames."""
+
+    # Navigation buttons and the `get_track_fn` key of the frame they jump to
+    NAVIGATION = [("Start", "first"), ("End", "last"), ("Next RFID", "next_change")]
+
+    def __init__(
+        self,
+        root: tk.Frame,
+        rfids: list[int],
+        submit: Callable,
+        navigate: Callable | None = None,
+    ) -> None:
+        self.yolo: int | None = None
+        self.rfid: int | None = None
+
+        # RFID run under the current frame, and the From/To text prefilled from
+        # it; entries holding anything else were typed by the user
+        self.run: tuple[int, int] | None = None
+        self.prefilled = ("", "")
+
+        self.row1 = tk.Frame(root)
+        self.row2 = tk.Frame(root)
+
+        # YOLO Label
+        self.yolo_label = tk.Label(self.row1)
+        self.yolo_label.grid(row=0, column=0)
+
+        # RFID Entry
+        self.rfid_var = tk.StringVar(self.row1)
+        rfid_dropdown = tk.OptionMenu(
+            self.row1,
+            self.rfid_var,
+            *list(map(str, rfids)),
+        )
+        rfid_dropdown.grid(row=0, column=1, padx=5)
+
+        # Track Navigation
+        if navigate is not None:
+            for column, (text, target) in enumerate(EditRow.NAVIGATION, start=2):
+                tk.Button(
+                    self.row1,
+                    text=text,
+                    command=lambda target=target: navigate(self.yolo, target),
+                ).grid(row=0, column=column)
+
+        # From Frame Entry
+        from_label = tk.Label(self.row2, text="From Frame:")
+        from_label.grid(row=0, column=0)
+        self.from_entry = tk.Entry(self.row2, width=10)
+        self.from_entry.grid(row=0, column=1)
+
+        # To Frame Entry
+        to_label = tk.Label(self.row2, text="To Frame:")
+        to_label.grid(row=0, column=2)
+        self.to_entry = tk.Entry(self.row2, width=10)
+        self.to_entry.grid(row=0, column=3)
+
+        # Submit Button
+        submit_button = tk.Button(
+            self.row2,
+            text="Submit",
+            command=lambda: submit(self.yolo),
+        )
+        submit_button.grid(row=0, column=4, padx=5, pady=2, sticky="w")
+
+    def show(self, row_idx: int, yolo: int, rfid: int | None) -> None:
+        if yolo != self.yolo:
+            self.yolo = yolo
+            self.yolo_label.configure(text=f"YOLO {yolo}")
+            self._set_range(("", ""))
+            self.run = None
+
+        if rfid != self.rfid:
+            self.rfid = rfid
+            self.run = None
+
+        self.rfid_var.set(str(rfid))
+        self.row1.grid(row=2 * row_idx, column=0, sticky="w", padx=0, pady=2)
+        self.row2.grid(row=2 * row_idx + 1, column=0, sticky="w", pady=2)
+
+    def prefill(self, run: tuple[int, int] | None) -> None:
+        """Show `run` in From/To, unless the user typed a range of their own."""
+        self.run = run
+        if (self.from_entry.get(), self.to_entry.get()) != self.prefilled:
+            return
+
+        self._set_range((str(run[0]), str(run[1])) if run else ("", ""))
+
+    def release_range(self) -> None:
+        """Let the next prefill replace whatever From/To hold now."""
+        self.prefilled = (self.from_entry.get(), self.to_entry.get())
+        self.run = None
+
+    def hide(self) -> None:
+        self.yolo = None
+        self.rfid = None
+        self.row1.grid_remove()
+        self.row2.grid_remove()
+
+    def _set_range(self, text: tuple[str, str]) -> None:
+        self.from_entry.delete(0, tk.END)
+        self.to_entry.delete(0, tk.END)
+        self.from_entry.insert(0, text[0])
+        self.to_entry.insert(0, text[1])
+        self.prefilled = text
+
+
 class EditFrame:
+    """
+    Editor of the RFIDs of the YOLO IDs in the current frame.
+
+    Rows are pooled: widgets are created the first time that many YOLO IDs are
+    shown and reconfigured afterwards, and nothing is touched while the frame's
+    assignments stay the same. With `refresh_while_playing` off, updates made
+    during playback are held back and applied once playback stops.
+
+    With `get_track_fn` (see `repo.get_track_info`) and `seek_fn`, every row can
+    jump to the start or end of its track or to its next RFID change, and the
+    From/To fields follow the RFID run under the current frame until the user
+    types a range of their own.
+    """
+
     def __init__(
         self,
         root: tk.Frame,
@@ -14,95 +136,115 @@ class EditFrame:
         update_callback: Callable[[int], None] | None = None,
         width: int = 640,
         height: int = 360,
+        is_playing: Callable[[], bool] | None = None,
+        refresh_while_playing: bool = True,
+        get_track_fn: Callable[[int, int], dict] | None = None,
+        seek_fn: Callable[[int], None] | None = None,
     ) -> None:
         self.root = root
         self.rfids = rfids
         self.get_data_fn = get_data_fn
         self.set_data_fn = set_data_fn
         self.update_callback = update_callback
+        self.is_playing = is_playing
+        self.refresh_while_playing = refresh_while_playing
+        self.get_track_fn = get_track_fn
+        self.seek_fn = seek_fn
 
         self.frame = tk.Frame(root, width=width, height=height)
         self.frame.pack(fill="both", expand=True)
 
+        self.rows: list[EditRow] = []
+        self.shown: list[tuple[int, int | None]] | None = None
+        self.frame_number = 0
+
         self.update(0)
 
     def bind_update_callback(self, callback: Callable[[int], None]) -> None:
         self.update_callback = callback
 
     def update(self, frame_number: int) -> None:
-        data = self.get_data_fn(frame_number)
-
-        for widget in self.frame.winfo_children():
-            widget.destroy()
-
-        self.entry_widgets = {}
-        self.change_mode_widgets = {}
-
-        row_idx = 0
-
-        for yolo, rfid in sorted(data.items()):
-            row1 = tk.Frame(self.frame)
-            row1.grid(row=row_idx, column=0, sticky="w", padx=0, pady=2)
-            row_idx += 1
-
-            # YOLO Label
-            yolo_label = tk.Label(row1, text=f"YOLO {yolo}")
-            yolo_label.grid(row=0, column=0)
-
-            # RFID Entry
-            rfid_var = tk.StringVar(row1, value=str(rfid))
-            rfid_dropdown = tk.OptionMenu(
-                row1,
-                rfid_var,
-                *list(map(str, self.rfids)),
-            )
-            rfid_dropdown.grid(row=0, column=1, padx=5)
-
-            row2 = tk.Frame(self.frame)
-            row2.grid(row=row_idx, column=0, sticky="w", pady=2)
-            row_idx += 1
-
-            # From Frame Entry
-            from_label = tk.Label(row2, text="From Frame:")
-            from_label.grid(row=0, column=0)
-            from_entry = tk.Entry(row2, width=10)
-            from_entry.grid(row=0, column=1)
-
-            # To Frame Entry
-            to_label = tk.Label(row2, text="To Frame:")
-            to_label.grid(row=0, column=2)
-            to_entry = tk.Entry(row2, width=10)
-            to_entry.grid(row=0, column=3)
-
-            self.entry_widgets[yolo] = {
-                "rfid": rfid_var,
-                "to": to_entry,
-                "from": from_entry,
-            }
-
-            # Submit Button
-            submit_button = tk.Button(
-                row2,
-                text="Submit",
-                command=lambda y=yolo: self._submit_changes(frame_number, int(y)),
-            )
-            submit_button.grid(row=0, column=4, padx=5, pady=2, sticky="w")
-
-    def _submit_changes(self, frame_number: int, yolo_id: int) -> None:
-        if not self.entry_widgets[yolo_id]["rfid"].get():
+        self.frame_number = frame_number
+
+        if (
+            not self.refresh_while_playing
+            and self.is_playing is not None
+            and self.is_playing()
+        ):
+            return
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Bring the rows in line with the current frame's assignments."""
+        shown = sorted(self.get_data_fn(self.frame_number).items())
+        if shown != self.shown:
+            navigate = self._navigate if self.seek_fn is not None else None
+            while len(self.rows) < len(shown):
+                self.rows.append(
+                    EditRow(self.frame, self.rfids, self._submit_changes, navigate)
+                )
+
+            for row_idx, (yolo, rfid) in enumerate(shown):
+                self.rows[row_idx].show(row_idx, yolo, rfid)
+
+            for row in self.rows[len(shown) :]:
+                if row.yolo is not None:
+                    row.hide()
+
+            self.shown = shown
+
+        self._prefill()
+
+    def invalidate_runs(self) -> None:
+        """Recompute the prefilled runs on the next refresh, after an edit."""
+        for row in self.rows:
+            row.run = None
+
+    def _prefill(self) -> None:
+        """Refill From/To of the rows whose run no longer holds the frame."""
+        if self.get_track_fn is None:
+            return
+
+        for row in self.rows[: len(self.shown)]:
+            if row.run is None or not row.run[0] <= self.frame_number <= row.run[1]:
+                row.prefill(self._run(row.yolo))
+
+    def _run(self, yolo_id: int) -> tuple[int, int] | None:
+        if self.get_track_fn is None:
+            return None
+
+        info = self.get_track_fn(yolo_id, self.frame_number)
+        if info["run_start"] is None:
+            return None
+        return info["run_start"], info["run_end"]
+
+    def _navigate(self, yolo_id: int | None, target: str) -> None:
+        if yolo_id is None or self.get_track_fn is None or self.seek_fn is None:
+            return
+
+        frame = self.get_track_fn(yolo_id, self.frame_number)[target]
+        if frame is not None:
+            self.seek_fn(frame)
+
+    def _submit_changes(self, yolo_id: int | None) -> None:
+        row = next((row for row in self.rows if row.yolo == yolo_id), None)
+        if row is None or not row.rfid_var.get():
             return
 
-        rfid = int(self.entry_widgets[yolo_id]["rfid"].get())
+        rfid = int(row.rfid_var.get())
 
         from_frame = None
-        if self.entry_widgets[yolo_id]["from"].get():
-            from_frame = int(self.entry_widgets[yolo_id]["from"].get())
+        if row.from_entry.get():
+            from_frame = int(row.from_entry.get())
 
         to_frame = None
-        if self.entry_widgets[yolo_id]["to"].get():
-            to_frame = int(self.entry_widgets[yolo_id]["to"].get())
+        if row.to_entry.get():
+            to_frame = int(row.to_entry.get())
 
+        # The submitted range is spent: the edit's new run may replace it
+        row.release_range()
         self.set_data_fn(yolo_id, rfid, from_frame, to_frame)
 
         if self.update_callback:
-            self.update_callback(frame_number)
+            self.update_callback(self.frame_number)
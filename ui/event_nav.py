@@ -1,14 +1,41 @@
 from collections.abc import Callable
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Protocol
+
+
+class EventSource(Protocol):
+    """Indexable events; labels are only asked for the rows on screen."""
+
+    def __len__(self) -> int:
+        ...
+
+    def frame(self, i: int) -> int:
+        ...
+
+    def label(self, i: int) -> str:
+        ...
+
+    def patch(self, removed: Any, added: Any) -> None:
+        ...
 
 
 class EventListbox:
+    """
+    Virtualised list of events.
+
+    The Tk listbox only ever holds the rows that fit on screen; scrolling moves
+    a window over the event source and relabels those rows, so building and
+    refreshing the list doesn't depend on the number of events.
+    """
+
+    WHEEL_ROWS = 3
+
     def __init__(
         self,
         root,
-        get_data: Callable[[], List[Dict[str, int]]],
+        get_data: Callable[[], EventSource],
         on_click: Callable[[int], Any],
         height=360,
         width=640,
@@ -17,26 +44,87 @@ class EventListbox:
         self.get_data = get_data
         self.data = get_data()
 
+        self.top = 0
+        self.selected: int | None = None
+
+        self.scrollbar = ttk.Scrollbar(root, orient="vertical", command=self._on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+
         self.listbox = tk.Listbox(
-            root, selectmode="SINGLE", exportselection=False, height=height, width=width
+            root, selectmode="SINGLE", exportselection=False, width=width
         )
-        self.listbox.pack(fill="both", expand=False)
+        self.listbox.pack(side="left", fill="both", expand=True)
         self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda _: self._scroll_to(self.top - 1))
+        self.listbox.bind("<Button-5>", lambda _: self._scroll_to(self.top + 1))
+
+        font = tkfont.nametofont(self.listbox.cget("font"))
+        self.row_height = font.metrics("linespace") + 1
+        self.rows = self._visible_rows(height)
 
-        self.update()
+        self._render()
 
     def update(self) -> None:
         self.data = self.get_data()
+        self.selected = None
+        self._scroll_to(self.top)
+
+    def patch(self, removed: Any, added: Any) -> None:
+        """Apply an event diff to the source and redraw the visible rows."""
+        self.data.patch(removed, added)
+        self.selected = None
+        self._scroll_to(self.top)
+
+    def _scroll_to(self, top: int) -> None:
+        self.top = max(0, min(top, len(self.data) - self.rows))
+        self._render()
+
+    def _render(self) -> None:
+        end = min(self.top + self.rows, len(self.data))
+
         self.listbox.delete(0, tk.END)
+        for i in range(self.top, end):
+            self.listbox.insert(tk.END, self.data.label(i))
+
+        if self.selected is not None and self.top <= self.selected < end:
+            self.listbox.selection_set(self.selected - self.top)
+
+        if len(self.data) == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / len(self.data), end / len(self.data))
 
-        for event in self.data:
-            self.listbox.insert(tk.END, event["label"])
+    def _on_scroll(self, action: str, amount: str, unit: str | None = None) -> None:
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * len(self.data)))
+        elif unit == "pages":
+            self._scroll_to(self.top + int(amount) * self.rows)
+        else:
+            self._scroll_to(self.top + int(amount))
+
+    def _on_wheel(self, event) -> None:
+        step = -self.WHEEL_ROWS if event.delta > 0 else self.WHEEL_ROWS
+        self._scroll_to(self.top + step)
+
+    def _visible_rows(self, height: int) -> int:
+        border = int(self.listbox.cget("borderwidth")) + int(
+            self.listbox.cget("highlightthickness")
+        )
+        return max(1, (height - 2 * border) // self.row_height)
+
+    def _on_resize(self, event) -> None:
+        rows = self._visible_rows(event.height)
+        if rows != self.rows:
+            self.rows = rows
+            self._scroll_to(self.top)
 
     def _on_select(self, _):
         selected_idx = self.listbox.curselection()
         if selected_idx:
-            selected_event = self.data[selected_idx[0]]
-            self.on_click(selected_event["frame"])
+            self.selected = self.top + selected_idx[0]
+            self.on_click(self.data.frame(self.selected))
 
 
 class EventNavigator:
@@ -72,3 +160,6 @@ class EventNavigator:
     def update(self):
         for listbox in self.listboxes.values():
             listbox.update()
+
+    def patch(self, tab_name: str, removed: Any, added: Any) -> None:
+        self.listboxes[tab_name].patch(removed, added)
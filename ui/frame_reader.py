@@ -0,0 +1,311 @@
+import cv2
+import numpy as np
+import threading
+
+from collections import deque, OrderedDict
+from cv2.typing import MatLike
+
+from .profiling import StageTimings
+
+
+class FrameReader:
+    """
+    Decodes frames from a video, avoiding container seeks on forward playback.
+
+    Reads that move forward a few frames at a time are served from a bounded buffer
+    filled ahead of the play head by a background decoder thread. Any other read
+    stops the read-ahead and seeks to the requested frame with OpenCV's frame
+    seek. With a keyframe index, jumps ahead that need fewer frames decoded than
+    the seek would are rolled forward from the current position instead.
+    """
+
+    # Consecutive forward reads before the read-ahead kicks in
+    SEQUENTIAL_RUN = 3
+
+    # Largest forward step still treated as sequential, so dropped frames
+    # during playback don't break the read-ahead
+    MAX_FORWARD_STEP = 8
+
+    DEFAULT_FPS = 30.0
+
+    # Frames decoded when backfilling before a frame, until keyframes are known
+    DEFAULT_GOP_SIZE = 30
+
+    # OpenCV's frame seek lands on the keyframe before this many frames ahead of
+    # the target and decodes forward from there
+    OPENCV_SEEK_BACKOFF = 16
+
+    def __init__(
+        self,
+        video_path: str,
+        buffer_size: int = 32,
+        keyframes: np.ndarray | None = None,
+        timings: StageTimings | None = None,
+    ):
+        """`timings` records the "seek" and "decode" stages of reads."""
+        self.cap = cv2.VideoCapture(video_path)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or FrameReader.DEFAULT_FPS
+        self.buffer_size = buffer_size
+        self.gop_size = FrameReader.DEFAULT_GOP_SIZE
+        self.keyframes = keyframes
+        self.timings = timings or StageTimings()
+
+        # Guards the capture; always taken before `_cond`
+        self._cap_lock = threading.Lock()
+
+        # Guards everything below
+        self._cond = threading.Condition()
+        self._buffer: deque[tuple[int, MatLike]] = deque()
+        self._next_frame = 0
+        self._generation = 0
+        self._last_read = -1
+        self._run_length = 0
+        self._prefetching = False
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self._thread.start()
+
+    def read(self, frame_number: int) -> MatLike | None:
+        with self._cond:
+            step = frame_number - self._last_read
+            if 0 < step <= FrameReader.MAX_FORWARD_STEP:
+                self._run_length += 1
+            else:
+                self._run_length = 0
+            self._last_read = frame_number
+
+            if self._run_length >= FrameReader.SEQUENTIAL_RUN:
+                # Past the end of the video or a failed decode there is nothing
+                # to read ahead until a seek puts the capture somewhere valid
+                if self._next_frame >= 0:
+                    self._prefetching = True
+                    self._cond.notify_all()
+
+                frame = self._take_buffered(frame_number)
+                if frame is not None:
+                    return frame
+            elif self._prefetching:
+                self._reset_buffer()
+
+        return self._decode(frame_number)
+
+    def read_range(self, start: int, stop: int) -> list[tuple[int, MatLike]]:
+        """Decode frames `start` to `stop - 1` with at most one seek."""
+        with self._cond:
+            self._run_length = 0
+            self._last_read = stop - 1
+            if self._prefetching:
+                self._reset_buffer()
+
+        frames = []
+        with self._cap_lock:
+            t = self.timings.start()
+            self._seek(start)
+            t = self.timings.stop("seek", t)
+
+            for frame_number in range(start, stop):
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                frames.append((frame_number, frame))
+            self.timings.stop("decode", t)
+
+            with self._cond:
+                complete = len(frames) == stop - start
+                self._next_frame = stop if complete else -1
+                if not complete:
+                    self._prefetching = False
+
+        return frames
+
+    def read_keyframe(self, frame_number: int) -> tuple[int, MatLike | None]:
+        """
+        Decode the keyframe at or before `frame_number`, which needs no decoding
+        of the frames in between. Falls back to the exact frame without an index.
+        """
+        if self.keyframes is None:
+            return frame_number, self.read(frame_number)
+
+        keyframe = self.gop_start(frame_number)
+        frames = self.read_range(keyframe, keyframe + 1)
+        return (keyframe, frames[0][1]) if frames else (keyframe, None)
+
+    def gop_start(self, frame_number: int) -> int:
+        """First frame of the group of pictures holding `frame_number`."""
+        if self.keyframes is None or len(self.keyframes) == 0:
+            return max(0, frame_number - frame_number % self.gop_size)
+
+        i = np.searchsorted(self.keyframes, frame_number, side="right") - 1
+        return int(self.keyframes[max(i, 0)])
+
+    def is_prefetching(self) -> bool:
+        with self._cond:
+            return self._prefetching
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._reset_buffer()
+        self._thread.join()
+        self.cap.release()
+
+    def _decode(self, frame_number: int) -> MatLike | None:
+        with self._cap_lock:
+            t = self.timings.start()
+            self._seek(frame_number)
+            t = self.timings.stop("seek", t)
+            ret, frame = self.cap.read()
+            self.timings.stop("decode", t)
+
+            with self._cond:
+                self._next_frame = frame_number + 1 if ret else -1
+                if not ret:
+                    self._prefetching = False
+
+        return frame if ret else None
+
+    def _seek(self, frame_number: int) -> None:
+        """Make `frame_number` the next decoded frame; needs `_cap_lock`."""
+        with self._cond:
+            current = self._next_frame
+
+        if current == frame_number:
+            return
+
+        # Short skips ahead (dropped frames) are grabbed without being converted
+        if 0 <= current < frame_number <= current + FrameReader.MAX_FORWARD_STEP:
+            for _ in range(frame_number - current):
+                self.cap.grab()
+            return
+
+        # Roll forward from where we are when the seek would decode more frames
+        if self.keyframes is not None and 0 <= current < frame_number:
+            backoff = max(frame_number - FrameReader.OPENCV_SEEK_BACKOFF, 0)
+            if frame_number - current <= frame_number - self.gop_start(backoff):
+                for _ in range(frame_number - current):
+                    self.cap.grab()
+                return
+
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+    def _take_buffered(self, frame_number: int) -> MatLike | None:
+        """Pop `frame_number` from the buffer, waiting for it if it is on its way."""
+        while True:
+            while self._buffer and self._buffer[0][0] < frame_number:
+                self._buffer.popleft()
+                self._cond.notify_all()
+
+            if self._buffer:
+                if self._buffer[0][0] != frame_number:
+                    return None
+
+                self._cond.notify_all()
+                return self._buffer.popleft()[1]
+
+            # Only wait for the frame being decoded; frames further ahead are
+            # reached quicker by grabbing past the ones in between
+            if not (self._prefetching and frame_number == self._next_frame):
+                return None
+
+            if not self._cond.wait(timeout=1.0):
+                return None
+
+    def _reset_buffer(self) -> None:
+        self._prefetching = False
+        self._generation += 1
+        self._buffer.clear()
+        self._cond.notify_all()
+
+    def _prefetch_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and (
+                    not self._prefetching
+                    or self._next_frame < 0
+                    or len(self._buffer) >= self.buffer_size
+                ):
+                    self._cond.wait()
+
+                if self._closed:
+                    return
+
+            with self._cap_lock:
+                with self._cond:
+                    if not self._prefetching or self._next_frame < 0:
+                        continue
+                    generation = self._generation
+                    frame_number = self._next_frame
+
+                ret, frame = self.cap.read()
+
+                with self._cond:
+                    if not ret:
+                        # End of video
+                        self._next_frame = -1
+                        self._prefetching = False
+                        self._cond.notify_all()
+                        continue
+
+                    self._next_frame = frame_number + 1
+                    if generation == self._generation:
+                        self._buffer.append((frame_number, frame))
+                        self._cond.notify_all()
+
+
+class FrameCache:
+    """LRU cache of decoded frames bounded by a memory budget."""
+
+    def __init__(self, budget_mb: float = 256):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames: OrderedDict[int, MatLike] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, frame_number: int) -> bool:
+        return frame_number in self._frames
+
+    def get(self, frame_number: int) -> MatLike | None:
+        frame = self._frames.get(frame_number)
+        if frame is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._frames.move_to_end(frame_number)
+        return frame
+
+    def put(self, frame_number: int, frame: MatLike) -> None:
+        if frame.nbytes > self.budget:
+            return
+
+        old = self._frames.pop(frame_number, None)
+        if old is not None:
+            self.size -= old.nbytes
+
+        self._frames[frame_number] = frame
+        self.size += frame.nbytes
+
+        while self.size > self.budget:
+            _, evicted = self._frames.popitem(last=False)
+            self.size -= evicted.nbytes
+
+    def clear(self) -> None:
+        self._frames.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "frames": len(self._frames),
+            "size_mb": self.size / (1024 * 1024),
+            "budget_mb": self.budget / (1024 * 1024),
+        }
@@ -0,0 +1,89 @@
+import csv
+import json
+import threading
+import time
+import numpy as np
+
+from collections import deque
+
+
+class StageTimings:
+    """
+    Rolling timings of the stages of the render loop.
+
+    Stages are timed by chaining `start` and `stop`, which return the time the
+    next stage starts at:
+
+        t = timings.start()
+        ...
+        t = timings.stop("read", t)
+        ...
+        timings.stop("draw", t)
+
+    While disabled both return 0.0 without reading the clock or recording
+    anything, so the hooks can stay in the hot path. Only the last `window`
+    samples of every stage are kept.
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window: int = 600, enabled: bool = False):
+        self.window = window
+        self.enabled = enabled
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> float:
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, stage: str, start: float) -> float:
+        """Record the time since `start` under `stage`; returns the current time."""
+        if not self.enabled or not start:
+            return 0.0
+
+        now = time.perf_counter()
+        self.record(stage, (now - start) * 1e3)
+        return now
+
+    def record(self, stage: str, ms: float) -> None:
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(ms)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Count, mean, percentiles and max in ms of every stage."""
+        with self._lock:
+            snapshot = {stage: np.array(s) for stage, s in self._samples.items()}
+
+        res = {}
+        for stage, ms in snapshot.items():
+            if len(ms) == 0:
+                continue
+            stats = {"count": len(ms), "mean": float(ms.mean())}
+            for p, value in zip(self.PERCENTILES, np.percentile(ms, self.PERCENTILES)):
+                stats[f"p{p}"] = float(value)
+            stats["max"] = float(ms.max())
+            res[stage] = stats
+        return res
+
+    def export(self, path: str) -> None:
+        """Write the summary as JSON, or as CSV if `path` ends in `.csv`."""
+        summary = self.summary()
+
+        if path.endswith(".csv"):
+            fields = ["stage", "count", "mean"]
+            fields += [f"p{p}" for p in self.PERCENTILES] + ["max"]
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for stage, stats in summary.items():
+                    writer.writerow({"stage": stage, **stats})
+        else:
+            with open(path, "w") as f:
+                json.dump({"window": self.window, "stages": summary}, f, indent=2)
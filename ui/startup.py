@@ -0,0 +1,171 @@
+import importlib
+import queue
+import threading
+import time
+import tkinter as tk
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+from typing import Any
+
+
+# Heavy modules of the session window, imported while the folder dialog is open
+APP_MODULES = [
+    "numpy",
+    "pandas",
+    "cv2",
+    "PIL.ImageTk",
+    "aspis.common",
+    "data.loader",
+    "data.repo",
+    "data.drawer",
+    "ui.video_player",
+    "ui.event_nav",
+    "ui.edit_data",
+]
+
+
+def preload_modules(modules: list[str] = APP_MODULES) -> threading.Thread:
+    """
+    Import `modules` on a daemon thread, so importing them later is instant.
+
+    Import errors are left for the real import to raise.
+    """
+
+    def run():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+
+class StartupTimer:
+    """Start-up milestones, in seconds since `origin` (a `perf_counter` time)."""
+
+    def __init__(self, origin: float | None = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks: dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        """Record `name` the first time it is reached; returns its time."""
+        return self.marks.setdefault(name, time.perf_counter() - self.origin)
+
+    def since(self, name: str, start: str) -> float:
+        return self.marks[name] - self.marks[start]
+
+    def report(self, start: str) -> str:
+        """Milestones before `start` from the origin, the rest from `start`."""
+        before = [(n, t) for n, t in self.marks.items() if t < self.marks[start]]
+        after = [(n, t) for n, t in self.marks.items() if t > self.marks[start]]
+        parts = [f"{n} {t:.2f}s" for n, t in before]
+        res = f"Startup: {', '.join(parts)}" if parts else "Startup:"
+        parts = [f"{n} {t - self.marks[start]:.2f}s" for n, t in after]
+        return f"{res}; after {start}: {', '.join(parts)}"
+
+
+class LoadingView:
+    """A progress bar per start-up job, shown until the session window is built."""
+
+    def __init__(self, root, jobs: list[str], length: int = 400):
+        self.frame = tk.Frame(root)
+        self.labels: dict[str, tk.Label] = {}
+        self.bars: dict[str, ttk.Progressbar] = {}
+
+        for row, job in enumerate(jobs):
+            label = tk.Label(self.frame, text=f"{job}: waiting", anchor="w")
+            label.grid(row=2 * row, column=0, sticky="ew")
+            bar = ttk.Progressbar(
+                self.frame, length=length, mode="determinate", maximum=1.0
+            )
+            bar.grid(row=2 * row + 1, column=0, pady=(0, 10))
+            self.labels[job] = label
+            self.bars[job] = bar
+
+    def update(self, job: str, stage: str, fraction: float):
+        self.labels[job].configure(text=f"{job}: {stage}")
+        self.bars[job]["value"] = fraction
+
+    def destroy(self):
+        self.frame.destroy()
+
+
+class StartupLoader:
+    """
+    Runs start-up jobs in parallel on worker threads.
+
+    Every job is called with a `progress(stage, fraction)` function. Progress,
+    results and errors are queued and handed to the callbacks on the Tk thread
+    by polling, like BackgroundSaver; `on_ready` gets every job's result once
+    they have all finished.
+    """
+
+    POLL_MS = 20
+
+    def __init__(
+        self,
+        root: tk.Misc,
+        jobs: dict[str, Callable[[Callable[[str, float], None]], Any]],
+        on_progress: Callable[[str, str, float], None],
+        on_job_done: Callable[[str], None],
+        on_ready: Callable[[dict[str, Any]], None],
+        on_error: Callable[[str, Exception], None],
+    ):
+        self.root = root
+        self.on_progress = on_progress
+        self.on_job_done = on_job_done
+        self.on_ready = on_ready
+        self.on_error = on_error
+
+        self.n_jobs = len(jobs)
+        self.results: dict[str, Any] = {}
+        self.events: queue.Queue[tuple[str, str, Any]] = queue.Queue()
+        self.failed = False
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, len(jobs)), thread_name_prefix="startup"
+        )
+        for name, job in jobs.items():
+            self.executor.submit(self._run, name, job)
+        self.executor.shutdown(wait=False)
+
+        self.root.after(StartupLoader.POLL_MS, self._poll)
+
+    def _run(self, name: str, job: Callable) -> None:
+        try:
+            result = job(
+                lambda stage, fraction: self.events.put(
+                    ("progress", name, (stage, fraction))
+                )
+            )
+            self.events.put(("done", name, result))
+        except Exception as e:
+            self.events.put(("error", name, e))
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                kind, name, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                self.on_progress(name, *payload)
+            elif kind == "done":
+                self.results[name] = payload
+                self.on_job_done(name)
+            elif not self.failed:
+                self.failed = True
+                self.on_error(name, payload)
+
+        if self.failed:
+            return
+        if len(self.results) == self.n_jobs:
+            self.on_ready(self.results)
+            return
+        self.root.after(StartupLoader.POLL_MS, self._poll)
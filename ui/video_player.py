@@ -1,18 +1,44 @@
 import aspis.common as A
 import cv2
+import numpy as np
+import queue
+import threading
+import time
 import tkinter as tk
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from cv2.typing import MatLike
 from PIL import Image, ImageTk
 from typing import Callable
 
+from .frame_reader import FrameCache, FrameReader
+from .profiling import StageTimings
+
 
 def render_frame(canvas, frame):
+    """
+    Show `frame` on `canvas`, reusing a single image item and PhotoImage.
+
+    The pixels are pasted into the existing PhotoImage; a new one is only made
+    when the frame size changes.
+    """
     height, width, _ = frame.shape
+    img = Image.fromarray(frame)
+    photo = getattr(canvas, "image", None)
+
+    if photo is not None and (photo.width(), photo.height()) == (width, height):
+        photo.paste(img)
+        return
+
     canvas.config(width=width, height=height)
-    img = ImageTk.PhotoImage(master=canvas, image=Image.fromarray(frame))
-    canvas.image = img
-    canvas.create_image(0, 0, anchor=tk.NW, image=img)
+    photo = ImageTk.PhotoImage(master=canvas, image=img)
+    canvas.image = photo
+
+    image_item = getattr(canvas, "image_item", None)
+    if image_item is None:
+        canvas.image_item = canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+    else:
+        canvas.itemconfigure(image_item, image=photo)
 
 
 class VideoPlayerState:
@@ -29,6 +55,65 @@ class VideoPlayerState:
         return self._is_playing
 
 
+class PlaybackClock:
+    """Maps wall-clock time to the frame that should be on screen while playing."""
+
+    def __init__(self, fps: float):
+        self.fps = fps
+        self.start(0)
+
+    def start(self, frame_number: int):
+        self.start_time = time.perf_counter()
+        self.start_frame = frame_number
+        self.last_frame = frame_number
+        self.displayed = 0
+
+    def target_frame(self) -> int:
+        elapsed = time.perf_counter() - self.start_time
+        return self.start_frame + int(elapsed * self.fps)
+
+    def advance(self, frame_number: int):
+        self.last_frame = max(self.last_frame, frame_number)
+
+    def frame_displayed(self):
+        self.displayed += 1
+
+    def delay_ms(self) -> int:
+        """Milliseconds until the frame after the current target is due."""
+        elapsed = time.perf_counter() - self.start_time
+        next_due = (int(elapsed * self.fps) + 1) / self.fps
+        return max(1, round((next_due - elapsed) * 1000))
+
+    def stats(self) -> dict:
+        elapsed = time.perf_counter() - self.start_time
+        advanced = self.last_frame - self.start_frame
+        return {
+            "target_fps": self.fps,
+            "achieved_fps": self.displayed / elapsed if elapsed > 0 else 0.0,
+            "dropped_frames": max(0, advanced - self.displayed),
+        }
+
+
+class VideoPlayerStatus:
+    def __init__(self, root):
+        self.status_frame = tk.Frame(root)
+        self.status_frame.pack(pady=2)
+
+        self.draw()
+
+    def draw(self):
+        self.status_label = tk.Label(self.status_frame, text="")
+        self.status_label.grid(row=0, column=0)
+
+    def update(self, stats: dict):
+        self.status_label.configure(
+            text=(
+                f"{stats['achieved_fps']:.1f} / {stats['target_fps']:.1f} fps"
+                f" | {stats['dropped_frames']} dropped"
+            )
+        )
+
+
 class VideoPlayerControls:
     def __init__(self, root, video_player, state, from_=0, to_=100):
         self.control_frame = tk.Frame(root)
@@ -169,6 +254,10 @@ class VideoPlayerTimeline:
         self.to_ = to_
         self.width = width
 
+        # Scrubbing: only the latest slider value is rendered
+        self.dragging = False
+        self.pending_frame = None
+
         self.draw()
 
     def draw(self):
@@ -183,6 +272,9 @@ class VideoPlayerTimeline:
         )
         self.timeline.grid(row=0, column=0, padx=10)
 
+        self.timeline.bind("<ButtonPress-1>", self._on_drag_start, add="+")
+        self.timeline.bind("<ButtonRelease-1>", self._on_drag_end, add="+")
+
     def update(self, curr_frame):
         self.timeline.configure(command="")
         self.timeline.set(curr_frame)
@@ -191,38 +283,105 @@ class VideoPlayerTimeline:
     def on_timeline_change(self, value):
         try:
             frame_number = int(value)
-            self.vp.pause()
-            self.vp.update(frame_number)
         except ValueError:
-            pass
+            return
+
+        self.vp.pause()
+
+        # Coalesce the burst of slider events into one render when Tk is idle
+        if self.pending_frame is None:
+            self.timeline.after_idle(self._flush)
+        self.pending_frame = frame_number
+
+    def _flush(self):
+        frame_number, self.pending_frame = self.pending_frame, None
+        if frame_number is not None:
+            self.vp.update(frame_number, preview=self.dragging)
+
+    def _on_drag_start(self, _):
+        self.dragging = True
+
+    def _on_drag_end(self, _):
+        self.dragging = False
+        self.pending_frame = None
+
+        # Full quality render where the slider settled
+        self.vp.update(int(self.timeline.get()))
 
 
 class VideoPlayer:
+    # Workers rendering frames; decoding itself is serialised on the capture
+    PIPELINE_WORKERS = 3
+    RESULT_POLL_MS = 5
+    HUD_INTERVAL_MS = 500
+    HUD_FONT = ("TkFixedFont", 9)
+
     def __init__(
         self,
         root: tk.Frame,
         video_path: str,
         width=728,
         height=544,
-        draw_fn: Callable[[MatLike, int], MatLike] | None = None,
+        draw_fn: Callable[[MatLike, int, tuple[float, float]], MatLike] | None = None,
         update_callback: Callable[[int], None] | None = None,
+        cache_mb: float = 256,
+        keyframes: np.ndarray | None = None,
+        timings: StageTimings | None = None,
+        reader: FrameReader | None = None,
+        first_frame: MatLike | None = None,
+        on_first_frame: Callable[[], None] | None = None,
     ):
+        """
+        `reader` and `first_frame` let the video be opened and its first frame
+        decoded ahead of time, e.g. on a worker thread during start-up.
+        `on_first_frame` is called once the first frame is on screen.
+        """
         self.vp_frame = tk.Frame(root)
 
-        self.cap = cv2.VideoCapture(video_path)
+        # Per-stage timings; recorded while enabled or while the HUD is shown
+        self.timings = timings or StageTimings()
+        self.profiling = self.timings.enabled
+        self.hud_job = None
+
+        self.reader = reader or FrameReader(video_path, keyframes=keyframes)
+        self.reader.timings = self.timings
+        self.frame_cache = FrameCache(cache_mb)
+        if first_frame is not None:
+            self.frame_cache.put(0, first_frame)
+        self.on_first_frame = on_first_frame
+        self.last_read = -1
         self.draw_fn = draw_fn
         self.update_callback = update_callback
-        self.process_frame = A.compose(
-            A.partial(cv2.cvtColor, code=cv2.COLOR_BGR2RGB),
-            A.partial(cv2.resize, dsize=(width, height), interpolation=cv2.INTER_AREA),
+        self.width = width
+        self.height = height
+        self.resize_frame = A.partial(
+            cv2.resize, dsize=(width, height), interpolation=cv2.INTER_AREA
         )
+        self.preview_resize_frame = A.partial(
+            cv2.resize, dsize=(width, height), interpolation=cv2.INTER_NEAREST
+        )
+        self.convert_frame = A.partial(cv2.cvtColor, code=cv2.COLOR_BGR2RGB)
 
         # Range
         self.from_ = 0
-        self.to_ = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.to_ = self.reader.frame_count
+
+        # Render pipeline: workers decode, draw and convert, Tk only blits
+        self.pipeline = ThreadPoolExecutor(
+            max_workers=VideoPlayer.PIPELINE_WORKERS,
+            thread_name_prefix="render",
+        )
+        # Guards the reader, the frame cache and `latest_rendered`
+        self.decode_lock = threading.Lock()
+        self.results: queue.Queue[tuple[int, MatLike, float]] = queue.Queue()
+        self.pending: list[Future] = []
+        self.latest_request = 0
+        self.latest_rendered = 0
 
         # State
         self.vp_state = VideoPlayerState(False)
+        self.clock = PlaybackClock(self.reader.fps)
+        self.playback_job = None
 
         # Canvas
         self.canvas = tk.Canvas(self.vp_frame, width=width, height=height)
@@ -250,53 +409,238 @@ class VideoPlayer:
             from_=self.from_,
             to_=self.to_,
         )
+        self.status = VideoPlayerStatus(self.vp_frame)
 
         # Update
         self.update(self.from_)
+        self._poll_results()
 
     def bind_update_callback(self, callback: Callable[[int], None]):
         self.update_callback = callback
 
-    def update(self, frame_number=None):
+    def update(self, frame_number=None, preview=False):
         if frame_number is not None:
             self.frame_number = frame_number
 
         if not (self.frame_number <= self.to_ and self.frame_number >= self.from_):
             return
 
-        if self.update_callback is not None:
+        requested = self.timings.start()
+
+        # Previews skip the side panels; they refresh on the full render
+        if self.update_callback is not None and not preview:
             self.update_callback(self.frame_number)
+            self.timings.stop("callbacks", requested)
 
         # Update Fields
         self.frame_entry.update(self.frame_number)
         self.timeline.update(self.frame_number)
 
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.frame_number)
-
-        ret, frame = self.cap.read()
-        if ret:
-            frame = self._draw_frame(frame)
-            frame = render_frame(self.canvas, frame)
+        # Requests that haven't started yet are superseded by this one
+        for future in self.pending:
+            future.cancel()
+
+        self.latest_request += 1
+        self.pending = [future for future in self.pending if not future.done()]
+        self.pending.append(
+            self.pipeline.submit(
+                self._render,
+                self.frame_number,
+                self.latest_request,
+                preview,
+                requested,
+                self.timings.start(),
+            )
+        )
 
     def play(self):
         self.vp_state.play()
+        self.clock.start(self.frame_number)
+
+        if self.playback_job is not None:
+            self.vp_frame.after_cancel(self.playback_job)
         self._update_frame()
 
     def pause(self):
+        was_playing = self.vp_state.is_playing()
         self.vp_state.pause()
 
+        if self.playback_job is not None:
+            self.vp_frame.after_cancel(self.playback_job)
+            self.playback_job = None
+
+        # Lets panels that skipped refreshes during playback catch up. Pausing a
+        # player that was already paused (every timeline event does) is a no-op.
+        if was_playing and self.update_callback is not None:
+            self.update_callback(self.frame_number)
+
+    def get_playback_stats(self) -> dict:
+        return self.clock.stats()
+
     def get_current_frame(self):
         return self.frame_number
 
-    def _draw_frame(self, frame: MatLike):
+    def get_cache_stats(self) -> dict:
+        return self.frame_cache.stats()
+
+    def _read_frame(self, frame_number: int) -> MatLike | None:
+        frame = self.frame_cache.get(frame_number)
+
+        if frame is None and frame_number < self.last_read:
+            # Stepping back: decode and keep the whole GOP up to this frame
+            start = self.reader.gop_start(frame_number)
+            for n, decoded in self.reader.read_range(start, frame_number + 1):
+                self.frame_cache.put(n, decoded)
+                frame = decoded
+
+        if frame is None:
+            frame = self.reader.read(frame_number)
+            if frame is not None:
+                self.frame_cache.put(frame_number, frame)
+
+        self.last_read = frame_number
+        return frame
+
+    def _render(
+        self,
+        frame_number: int,
+        request_id: int,
+        preview: bool,
+        requested: float,
+        submitted: float,
+    ) -> None:
+        """Runs on a pipeline worker; gives up once a newer frame was rendered."""
+        self.timings.stop("queue", submitted)
+
+        t = self.timings.start()
+        with self.decode_lock:
+            t = self.timings.stop("lock", t)
+            if request_id < self.latest_rendered:
+                return
+
+            if preview:
+                frame_number, frame = self._read_preview_frame(frame_number)
+            else:
+                frame = self._read_frame(frame_number)
+
+        self.timings.stop("read", t)
+
+        if frame is None or request_id < self.latest_rendered:
+            return
+        frame = self._draw_frame(frame, frame_number, preview)
+
+        if request_id < self.latest_rendered:
+            return
+        t = self.timings.start()
+        frame = self.convert_frame(frame)
+        self.timings.stop("convert", t)
+
+        with self.decode_lock:
+            if request_id < self.latest_rendered:
+                return
+            self.latest_rendered = request_id
+        self.results.put((request_id, frame, requested))
+
+    def _poll_results(self):
+        latest = None
+        while not self.results.empty():
+            latest = self.results.get_nowait()
+
+        if latest is not None:
+            t = self.timings.start()
+            render_frame(self.canvas, latest[1])
+            self.timings.stop("blit", t)
+            self.timings.stop("latency", latest[2])
+
+            if self.vp_state.is_playing():
+                self.clock.frame_displayed()
+
+            if self.on_first_frame is not None:
+                on_first_frame, self.on_first_frame = self.on_first_frame, None
+                on_first_frame()
+
+        self.vp_frame.after(VideoPlayer.RESULT_POLL_MS, self._poll_results)
+
+    def _read_preview_frame(self, frame_number: int) -> tuple[int, MatLike | None]:
+        """A cached frame, or the keyframe before it, which needs a single decode."""
+        frame = self.frame_cache.get(frame_number)
+        if frame is not None:
+            return frame_number, frame
+
+        frame_number, frame = self.reader.read_keyframe(frame_number)
+        if frame is not None:
+            self.frame_cache.put(frame_number, frame)
+        return frame_number, frame
+
+    def _draw_frame(self, frame: MatLike, frame_number: int, preview: bool = False):
+        # Overlays are drawn after resizing, in display coordinates, which also
+        # leaves the cached full-resolution frame untouched
+        scale = (self.width / frame.shape[1], self.height / frame.shape[0])
+        t = self.timings.start()
+        if preview:
+            frame = self.preview_resize_frame(frame)
+        else:
+            frame = self.resize_frame(frame)
+        t = self.timings.stop("resize", t)
+
         if self.draw_fn is not None:
-            frame = self.draw_fn(frame, self.frame_number)
-        frame = self.process_frame(frame)
+            frame = self.draw_fn(frame, frame_number, scale)
+            self.timings.stop("draw", t)
         return frame
 
+    def show_hud(self, show: bool) -> None:
+        """Overlay the rolling stage timings on the canvas."""
+        if self.hud_job is not None:
+            self.vp_frame.after_cancel(self.hud_job)
+            self.hud_job = None
+        self.canvas.delete("hud")
+
+        self.timings.enabled = show or self.profiling
+        if show:
+            self._update_hud()
+
+    def _update_hud(self):
+        lines = [f"{'stage':<9}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        for stage, stats in self.timings.summary().items():
+            p50, p95, p99 = stats["p50"], stats["p95"], stats["p99"]
+            lines.append(f"{stage:<9}{p50:>7.1f}{p95:>7.1f}{p99:>7.1f}")
+
+        self.canvas.delete("hud")
+        text = self.canvas.create_text(
+            8,
+            8,
+            anchor=tk.NW,
+            text="\n".join(lines),
+            fill="white",
+            font=VideoPlayer.HUD_FONT,
+            tags="hud",
+        )
+        self.canvas.create_rectangle(
+            self.canvas.bbox(text), fill="black", outline="", tags="hud"
+        )
+        self.canvas.tag_raise(text)
+
+        self.hud_job = self.vp_frame.after(
+            VideoPlayer.HUD_INTERVAL_MS, self._update_hud
+        )
+
     def _update_frame(self):
-        self.update(self.frame_number)
+        self.playback_job = None
+        if not self.vp_state.is_playing():
+            return
 
-        if self.vp_state.is_playing():
-            self.frame_number += 1
-            self.vp_frame.after(30, self._update_frame)
+        # Jump to the frame due now; anything in between is dropped
+        target = min(self.clock.target_frame(), self.to_)
+        if target > self.clock.last_frame:
+            self.update(target)
+            self.clock.advance(target)
+
+        self.status.update(self.clock.stats())
+
+        if target >= self.to_:
+            self.pause()
+            return
+
+        self.playback_job = self.vp_frame.after(
+            self.clock.delay_ms(), self._update_frame
+        )